@@ -0,0 +1,155 @@
+'''
+This script realigns every district of a multi-district roster in one
+job. The clubs are geocoded together, then each district runs the
+pipeline (area realignment, area assignment, centroids, division
+realignment and the district table) in its own process and its own
+directory under --directory. A summary of all districts and their
+combined alignment are written at the end.
+
+Example running:
+python batch.py clubs_raw.csv --engine kmeans
+python batch.py region_roster.csv --jobs 4 --districts 50 57
+'''
+import argparse
+import contextlib
+import copy
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+import area_realign
+import division_realign
+from pipeline import run_pipeline, STAGES
+from batch_functions import split_roster, district_directory, \
+                            district_summary, combine_alignments
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+                description='Realign every district of a roster.')
+    parser.add_argument('roster',
+                        help='roster csv with "District", "Club" and '
+                             '"Clubzip" columns')
+    parser.add_argument('--districts', nargs='+', default=None,
+                        help='only these districts')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                        help='districts realigned at the same time')
+    parser.add_argument('--directory', default='data/districts',
+                        help='where each district gets its own directory')
+    parser.add_argument('--until', choices=STAGES, default='district',
+                        help='last stage to bring up to date')
+    parser.add_argument('--force', nargs='*', choices=STAGES, default=[],
+                        help='stages to run even if they are up to date')
+    parser.add_argument('--division-generations', type=int,
+                        default=division_realign.MAX_GENERATIONS,
+                        help='maximum generations of the division stage')
+    parser.add_argument('--gis', default=None,
+                        help='write the clubs and boundaries of every '
+                             'district to this .geojson or .gpkg path in its '
+                             'directory')
+    area_realign.add_arguments(parser)
+    # Nobody is watching the plots of a batch
+    parser.set_defaults(plot='none')
+    return parser.parse_args(argv)
+
+def geocode_roster(args):
+    '''
+    Reads the roster and geocodes every club in one pass, so the zip
+    code index is loaded and the zip cache is written only once.
+    :returns: A data frame of district, club_no, zip, lat and long.
+    '''
+    # Imported here so the district processes never need it
+    import district_preprocessing
+    clubs = split_roster(pd.read_csv(args.roster))
+    if args.districts:
+        clubs = clubs[clubs['district'].isin(args.districts)].copy()
+    if args.seed is not None:
+        np.random.seed(args.seed)
+    return district_preprocessing.geocode_dataframe(clubs, output=None)
+
+def run_district(district, directory, args):
+    '''
+    Runs the pipeline for one district inside its directory. The
+    scripts use paths relative to the working directory, so changing
+    into it keeps every file of the district there. Output goes to
+    batch.log in the directory.
+    :returns: The district's summary dictionary.
+    '''
+    os.chdir(directory)
+    os.makedirs('data', exist_ok=True)
+    district_args = copy.copy(args)
+    district_args.clubs = os.path.abspath('club_zips.csv')
+    district_args.geocoded = True
+    district_args.area_clubs = None
+    district_args.directory = 'data/pipeline'
+    district_args.output = 'data/new_district_alignment.csv'
+
+    start_time = time.time()
+    summary = {'district': district, 'status': 'done'}
+    with open('batch.log', 'w') as log, contextlib.redirect_stdout(log):
+        try:
+            pipeline, _ = run_pipeline(district_args)
+            needed = pipeline.required([args.until])
+            results = {name: pipeline.result(name)
+                       for name in ('areas', 'centroids', 'divisions')
+                       if name in needed}
+            summary.update(district_summary(pipeline.result('clubs'),
+                                            metric=args.metric,
+                                            objective=args.objective,
+                                            **results))
+        except Exception as e:
+            traceback.print_exc(file=log)
+            summary.update(status='failed', error=repr(e))
+    summary['seconds'] = time.time() - start_time
+    return summary
+
+def main():
+    args = parse_args()
+    start_time = time.time()
+
+    clubs = geocode_roster(args)
+    directories = {}
+    for district, district_clubs in clubs.groupby('district'):
+        directories[district] = os.path.abspath(
+                                    district_directory(args.directory, district))
+        os.makedirs(directories[district], exist_ok=True)
+        district_clubs.to_csv(os.path.join(directories[district],
+                                           'club_zips.csv'), index=False)
+    print(f'Realigning {len(directories)} districts with {args.jobs} jobs.')
+
+    summaries = []
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = [executor.submit(run_district, district, directory, args)
+                   for district, directory in directories.items()]
+        for future in as_completed(futures):
+            summary = future.result()
+            print(f'District {summary["district"]}: {summary["status"]} '
+                  f'in {summary["seconds"]:.1f} seconds.')
+            summaries.append(summary)
+
+    summary = pd.DataFrame(summaries).sort_values('district')
+    summary_path = os.path.join(args.directory, 'summary.csv')
+    summary.to_csv(summary_path, index=False)
+
+    alignments = {}
+    finished = set(summary.loc[summary['status'] == 'done', 'district'])
+    for district, directory in directories.items():
+        path = os.path.join(directory, 'data', 'new_district_alignment.csv')
+        if args.until == 'district' and district in finished and \
+                os.path.exists(path):
+            alignments[district] = pd.read_csv(path)
+    if alignments:
+        alignment_path = os.path.join(args.directory,
+                                      'all_districts_alignment.csv')
+        combine_alignments(alignments).to_csv(alignment_path, index=False)
+        print(f'{alignment_path} created.')
+
+    print()
+    print(summary.to_string(index=False))
+    print(f'{summary_path} created.')
+    print(f'Execution time is {time.time() - start_time} seconds.')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+These functions prepare and summarize a batch run over a roster that
+holds several districts. The roster is split into one club table per
+district, every district gets its own directory so its stage results,
+caches and checkpoints never collide with another district's, and the
+per district results are combined into one summary table and one
+alignment table at the end.
+"""
+import os
+import pandas as pd
+from ga_area_functions import DistrictRealignment
+from ga_division_functions import AreaAlignment
+
+def district_label(value):
+    """
+    Turns a district read as a float (50.0) or string into a label.
+    :param value: The District cell.
+    :returns: A string such as '50' or 'F'.
+    """
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+def split_roster(roster):
+    """
+    Keeps the clubs with a district, club number and zip code.
+    :param roster: A data frame with District, Club and Clubzip columns.
+    :returns: A data frame of district, club_no and zip sorted by
+              district and club.
+    """
+    clubs = roster[['District', 'Club', 'Clubzip']].dropna()
+    clubs = clubs.rename(columns={'District': 'district', 'Club': 'club_no',
+                                  'Clubzip': 'zip'})
+    clubs['district'] = clubs['district'].map(district_label)
+    clubs['club_no'] = clubs['club_no'].astype(int)
+    return clubs.sort_values(['district', 'club_no']).reset_index(drop=True)
+
+def district_directory(directory, district):
+    """
+    :returns: The directory a district's run works in.
+    """
+    return os.path.join(directory, f'district_{district}')
+
+def district_summary(clubs, areas=None, centroids=None, divisions=None,
+                     metric='euclidean', objective='sequence'):
+    """
+    Scores a district's realignment.
+    :param clubs: The geocoded clubs in the order the areas index them.
+    :param areas: The best area ordering, if that stage ran.
+    :param centroids: The area centroids, if that stage ran.
+    :param divisions: The best division ordering, if that stage ran.
+    :param metric: The distance metric of the run.
+    :param objective: The group objective of the run.
+    :returns: A dictionary of counts and average distance scores.
+    """
+    summary = {'clubs': len(clubs)}
+    if areas is not None:
+        dr = DistrictRealignment(metric, objective,
+                                 clubs[['long', 'lat']].to_numpy())
+        summary['areas'] = dr.area_count
+        summary['area_score'] = dr.evaluate_district(areas)[0]
+    if centroids is not None and divisions is not None:
+        aa = AreaAlignment(metric, objective,
+                           centroids[['long', 'lat']].to_numpy())
+        summary['divisions'] = aa.division_count
+        summary['division_score'] = aa.evaluate_district(divisions)[0]
+    return summary
+
+def combine_alignments(alignments):
+    """
+    Stacks the district alignment tables.
+    :param alignments: A dictionary of district label to the data frame
+                       from district_alignment.
+    :returns: One data frame with a leading district column.
+    """
+    frames = [alignment.assign(district=district)
+              for district, alignment in sorted(alignments.items())]
+    if not frames:
+        return pd.DataFrame()
+    combined = pd.concat(frames, ignore_index=True)
+    return combined[['district'] + [c for c in combined.columns
+                                    if c != 'district']]
@@ -0,0 +1,77 @@
+'''
+This script benchmarks the area realignment on synthetic districts
+and writes the results to a JSON file. Pass an earlier file with
+--compare to see which measurements got faster or slower.
+
+Example running:
+python benchmark.py
+python benchmark.py --sizes 100 1000 --ga-seconds 5 --output new.json
+python benchmark.py --compare data/benchmarks/baseline.json
+'''
+import argparse
+import json
+import os
+import time
+
+import area_realign
+from benchmark_functions import run_benchmarks, compare_benchmarks
+
+SIZES = (100, 300, 1000, 3000, 10000)
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+                description='Benchmark the realignment on synthetic districts.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES),
+                        help='club counts of the synthetic districts')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the districts and runs')
+    parser.add_argument('--evaluation-seconds', type=float, default=1.0,
+                        help='time of each evaluation measurement')
+    parser.add_argument('--ga-seconds', type=float, default=10.0,
+                        help='genetic algorithm time per size (0 = skip)')
+    parser.add_argument('--output', default=None,
+                        help='results file (default data/benchmarks/'
+                             'benchmark_<time>.json)')
+    parser.add_argument('--compare', default=None,
+                        help='an earlier results file to compare against')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    results = run_benchmarks(args.sizes, area_realign.create_problem,
+                             seed=args.seed,
+                             evaluation_seconds=args.evaluation_seconds,
+                             ga_seconds=args.ga_seconds)
+
+    output = args.output or \
+        os.path.join('data', 'benchmarks',
+                     f'benchmark_{time.strftime("%Y%m%d_%H%M%S")}.json')
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    print()
+    print(f'{"clubs":>6}{"distances s":>13}{"peak MB":>10}'
+          f'{"evals/s":>12}{"batch evals/s":>15}{"gens/s":>9}{"best":>9}')
+    for result in results['results']:
+        print(f'{result["size"]:>6}{result["distance_seconds"]:>13.3f}'
+              f'{result["distance_peak_mb"]:>10.1f}'
+              f'{result["evaluate_district_per_second"]:>12,.0f}'
+              f'{result["evaluate_population_per_second"]:>15,.0f}'
+              f'{result.get("ga_generations_per_second", 0):>9.1f}'
+              f'{result.get("ga_best", float("nan")):>9.4f}')
+    print(f'Results written to {output}.')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print()
+        print(f'Compared with {args.compare}:')
+        for size, metric, old, new, ratio, change in \
+                compare_benchmarks(baseline, results):
+            print(f'{size:>6} {metric:<32}{old:>14.4g}{new:>14.4g}'
+                  f'{ratio:>8.2f}x {change}')
+
+if __name__ == "__main__":
+    main()
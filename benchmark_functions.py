@@ -0,0 +1,233 @@
+"""
+These functions benchmark the realignment engines on synthetic
+districts so their speed can be compared between versions without
+any private club data. A synthetic district mixes metro clusters of
+very different sizes (a few large cities and many small towns) with
+scattered rural clubs, which is how real club locations look. The
+same size and seed always give the same district. The measurements
+are the distance matrix build time and peak memory, evaluations per
+second of evaluate_district and of batched population evaluation,
+and the best fitness of the genetic algorithm over wall time.
+"""
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from deap import tools
+
+from distance_functions import pairwise_distances, DISTANCE_DTYPE
+from ga_area_functions import DistrictRealignment
+from ga_loop_functions import ea_simple_batched, EarlyStopping
+from logging_functions import FitnessStatistics, GenerationLogger, \
+                              load_generation_log
+
+# Long / lat bounds of the synthetic districts (north east Texas)
+BOUNDS = ((-97.5, 31.5), (-93.5, 34.0))
+
+# Measurements compared between runs and whether higher is better
+METRIC_DIRECTIONS = {'distance_seconds': False,
+                     'distance_peak_mb': False,
+                     'evaluate_district_per_second': True,
+                     'evaluate_population_per_second': True,
+                     'ga_generations_per_second': True,
+                     'ga_best': False}
+
+def synthetic_district(size, seed=0, rural_share=0.25):
+    """
+    Generates club locations clustered like a real district.
+    :param size: The number of clubs.
+    :param seed: The random seed.
+    :param rural_share: The share of clubs spread uniformly.
+    :returns: An (n, 2) float32 long/lat array.
+    """
+    rng = np.random.default_rng(seed)
+    (west, south), (east, north) = BOUNDS
+    rural = int(round(size * rural_share))
+    metros = max(2, int(round(np.sqrt(size) / 4)))
+    # Metro sizes fall off with rank, so one or two cities dominate
+    weights = 1 / np.arange(1, metros + 1)
+    counts = rng.multinomial(size - rural, weights / weights.sum())
+    centers = np.column_stack([rng.uniform(west, east, metros),
+                               rng.uniform(south, north, metros)])
+    # Bigger metros sprawl further
+    spreads = 0.03 + 0.15 * np.sqrt(counts / max(counts.max(), 1))
+    clubs = [centers[i] + rng.normal(0, spreads[i], (counts[i], 2))
+             for i in range(metros)]
+    clubs.append(np.column_stack([rng.uniform(west, east, rural),
+                                  rng.uniform(south, north, rural)]))
+    locations = np.concatenate(clubs)
+    locations[:, 0] = np.clip(locations[:, 0], west, east)
+    locations[:, 1] = np.clip(locations[:, 1], south, north)
+    return rng.permutation(locations).astype('float32')
+
+def benchmark_distances(locations, metric='euclidean'):
+    """
+    Times the distance matrix build and traces its peak memory.
+    :param locations: An (n, 2) coordinate array.
+    :param metric: The distance metric.
+    :returns: A dictionary of seconds, peak MB and matrix MB.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    distances = pairwise_distances(locations, metric).astype(DISTANCE_DTYPE)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'distance_seconds': seconds,
+            'distance_peak_mb': peak / 2 ** 20,
+            'distance_matrix_mb': distances.nbytes / 2 ** 20}
+
+def evaluation_rate(function, individuals, seconds):
+    """
+    Calls a function on individuals in turn for about the given time.
+    :param function: Called with one item of individuals.
+    :param individuals: The arguments cycled through.
+    :param seconds: The minimum time to measure.
+    :returns: Calls per second.
+    """
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for individual in individuals:
+            function(individual)
+        calls += len(individuals)
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return calls / elapsed
+
+def benchmark_evaluation(dr, seconds=1.0, population_size=100, seed=0):
+    """
+    Measures evaluations per second one at a time and in batches.
+    :param dr: A DistrictRealignment instance.
+    :param seconds: The minimum time of each measurement.
+    :param population_size: The batch size.
+    :param seed: The random seed of the permutations.
+    :returns: A dictionary of evaluations per second.
+    """
+    rng = np.random.default_rng(seed)
+    population = [rng.permutation(len(dr)).tolist()
+                  for _ in range(population_size)]
+    single = evaluation_rate(dr.evaluate_district, population, seconds)
+    batch = evaluation_rate(dr.evaluate_population, [population], seconds)
+    return {'evaluate_district_per_second': single,
+            'evaluate_population_per_second': batch * population_size}
+
+def benchmark_ga(create_problem, locations, seconds=10.0, population_size=100,
+                 cxpb=0.9, mutpb=0.15, seed=0, samples=50):
+    """
+    Runs the genetic algorithm for a fixed time and records the best
+    fitness over wall time.
+    :param create_problem: The runner's create_problem function.
+    :param locations: An (n, 2) coordinate array.
+    :param seconds: The time budget.
+    :param population_size: The population size.
+    :param cxpb: The probability of mating two individuals.
+    :param mutpb: The probability of mutating an individual.
+    :param seed: The random seed.
+    :param samples: The maximum number of (seconds, best) points kept.
+    :returns: A dictionary with the generations, generations per
+              second, final best and the best over time.
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    _, toolbox = create_problem('euclidean', locations=locations)
+    population = toolbox.population_creator(n=population_size)
+    with tempfile.TemporaryDirectory() as directory:
+        logger = GenerationLogger(os.path.join(directory, 'log.jsonl'),
+                                  progress_every=0)
+        ea_simple_batched(population, toolbox, cxpb, mutpb, ngen=10 ** 9,
+                          stats=FitnessStatistics(),
+                          halloffame=tools.HallOfFame(1), verbose=False,
+                          stopping=EarlyStopping(time_budget=seconds),
+                          logger=logger)
+        logger.close()
+        log = load_generation_log(logger.path)
+    elapsed = float(log.elapsed.iloc[-1])
+    step = max(1, len(log) // samples)
+    trace = log.iloc[::step][['elapsed', 'best']].values.tolist()
+    trace.append([elapsed, float(log.best.iloc[-1])])
+    return {'ga_generations': int(log.gen.iloc[-1]),
+            'ga_generations_per_second': int(log.gen.iloc[-1]) / elapsed,
+            'ga_best': float(log.best.iloc[-1]),
+            'ga_trace': trace}
+
+def environment():
+    """
+    Describes the machine and code version the benchmark ran on.
+    :returns: A dictionary of strings.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))
+                                ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'commit': commit,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.platform(),
+            'processor': platform.processor(),
+            'cpus': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+def run_benchmarks(sizes, create_problem=None, seed=0, evaluation_seconds=1.0,
+                   ga_seconds=10.0):
+    """
+    Benchmarks each district size in turn.
+    :param sizes: The club counts.
+    :param create_problem: The runner's create_problem function, or
+                           None to skip the genetic algorithm.
+    :param seed: The random seed of the districts and runs.
+    :param evaluation_seconds: The time of each evaluation measurement.
+    :param ga_seconds: The genetic algorithm time budget per size.
+    :returns: A dictionary of the environment and one result per size.
+    """
+    results = []
+    for size in sizes:
+        print(f'Benchmarking {size} clubs.')
+        locations = synthetic_district(size, seed)
+        result = {'size': size, 'seed': seed}
+        result.update(benchmark_distances(locations))
+        dr = DistrictRealignment(locations=locations)
+        result.update(benchmark_evaluation(dr, evaluation_seconds,
+                                           seed=seed))
+        del dr
+        if create_problem is not None and ga_seconds > 0:
+            result.update(benchmark_ga(create_problem, locations, ga_seconds,
+                                       seed=seed))
+        results.append(result)
+    return {'environment': environment(), 'results': results}
+
+def compare_benchmarks(old, new, tolerance=0.05):
+    """
+    Compares two benchmark results size by size.
+    :param old: The baseline dictionary from run_benchmarks.
+    :param new: The current dictionary from run_benchmarks.
+    :param tolerance: Relative changes smaller than this are 'same'.
+    :returns: A list of (size, metric, old, new, ratio, change) tuples,
+              where ratio is new over old and change is 'better',
+              'worse' or 'same'.
+    """
+    baseline = {result['size']: result for result in old['results']}
+    rows = []
+    for result in new['results']:
+        previous = baseline.get(result['size'])
+        if previous is None:
+            continue
+        for metric, higher in METRIC_DIRECTIONS.items():
+            if metric in result and metric in previous and previous[metric]:
+                ratio = result[metric] / previous[metric]
+                if abs(ratio - 1) < tolerance:
+                    change = 'same'
+                elif (ratio > 1) == higher:
+                    change = 'better'
+                else:
+                    change = 'worse'
+                rows.append((result['size'], metric, previous[metric],
+                             result[metric], ratio, change))
+    return rows
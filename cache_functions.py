@@ -0,0 +1,146 @@
+"""
+These functions cache fitness values by the partition a chromosome
+decodes to rather than by the chromosome itself. The order of the
+areas in the permutation does not change the score, and neither does
+rotating or reversing the members of an area, since the area score is
+the length of a closed cycle. Each area is brought to a canonical
+cycle (smallest member first, smaller neighbor second), the areas are
+sorted, and the result is hashed into a short key. When the area score
+does not depend on member order at all, the members are simply sorted.
+The cache itself is a bounded LRU dictionary with hit, miss and
+eviction counters. It lives in the process that runs the generation
+loop, so one cache serves every worker of a parallel evaluator.
+"""
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from evaluation_functions import population_array
+
+def canonical_cycles(members):
+    """
+    Rotates and reflects each cycle so equivalent cycles are identical.
+    :param members: A (groups, size) index array of cycles.
+    :returns: A new (groups, size) array.
+    """
+    size = members.shape[1]
+    start = np.argmin(members, axis=1)
+    rotated = np.take_along_axis(
+                    members, (start[:, None] + np.arange(size)) % size, axis=1)
+    flip = rotated[:, 1] > rotated[:, -1]
+    rotated[flip, 1:] = rotated[flip, :0:-1]
+    return rotated
+
+def partition_keys(population, layout, cyclic=True):
+    """
+    Makes an order-invariant key for every individual's partition.
+    :param population: A list of individuals or a 2-D index array.
+    :param layout: The layout from group_layout.
+    :param cyclic: Keep the cycle order of the members (True) or treat
+                   the members as an unordered set (False).
+    :returns: A list of 16-byte keys in population order.
+    """
+    population = population_array(population)
+    count = len(population)
+    parts = []
+    for _, positions in layout:
+        groups, size = positions.shape
+        members = population[:, positions].reshape(count * groups, size)
+        if cyclic:
+            members = canonical_cycles(members)
+        else:
+            members = np.sort(members, axis=1)
+        members = members.reshape(count, groups, size)
+        # Groups are disjoint, so their first (smallest) members differ
+        order = np.argsort(members[:, :, 0], axis=1)
+        members = np.take_along_axis(members, order[:, :, None], axis=1)
+        parts.append(members.reshape(count, groups * size))
+    rows = np.ascontiguousarray(np.concatenate(parts, axis=1), dtype=np.int32)
+    return [hashlib.blake2b(row.tobytes(), digest_size=16).digest()
+            for row in rows]
+
+class FitnessCache:
+    '''This class is a bounded least-recently-used map from partition
+    keys to fitness tuples that counts its hits, misses and evictions,
+    and the individuals actually evaluated on its misses (duplicates
+    within a batch are evaluated once).
+    '''
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evaluated = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Looks up a key and marks it as recently used.
+        :param key: The partition key.
+        :returns: The cached fitness or None.
+        """
+        fitness = self.entries.get(key)
+        if fitness is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return fitness
+
+    def put(self, key, fitness):
+        """
+        Stores a fitness, evicting the least recently used entry if full.
+        :param key: The partition key.
+        :param fitness: The fitness tuple.
+        """
+        self.entries[key] = fitness
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Summarizes the counters.
+        :returns: A dictionary of size, hits, misses, evictions, evaluated
+                  and hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {'size': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'evaluated': self.evaluated,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
+
+def cached_evaluation(evaluate_population, key_function, cache):
+    """
+    Wraps a batch evaluation function so only partitions missing from
+    the cache are evaluated. Duplicates within one batch are evaluated
+    once.
+    :param evaluate_population: The batch evaluation function.
+    :param key_function: A function returning one key per individual.
+    :param cache: The FitnessCache.
+    :returns: A batch evaluation function with the same signature.
+    """
+    def evaluate(population):
+        keys = key_function(population)
+        fitnesses = [cache.get(key) for key in keys]
+        missing = {}
+        for i, (key, fitness) in enumerate(zip(keys, fitnesses)):
+            if fitness is None and key not in missing:
+                missing[key] = i
+        if missing:
+            positions = list(missing.values())
+            scored = evaluate_population([population[i] for i in positions])
+            cache.evaluated += len(positions)
+            for key, fitness in zip(missing, scored):
+                cache.put(key, fitness)
+            found = dict(zip(missing, scored))
+            fitnesses = [found[key] if fitness is None else fitness
+                         for key, fitness in zip(keys, fitnesses)]
+        return fitnesses
+    return evaluate
@@ -12,7 +12,6 @@ python calculate_centroids.py clubs.csv
 import numpy as np
 import pandas as pd
 import pickle
-import geopandas as gpd
 import sys
 
 def main():
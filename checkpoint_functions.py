@@ -0,0 +1,98 @@
+"""
+These functions save and restore the state of a long realignment run.
+A checkpoint holds the population, hall of fame, logbook, generation
+counter, early stopping progress and the random / NumPy generator
+states, so a resumed run continues exactly where it left off. Files
+are written to a temporary name and then renamed over the old one,
+so a crash mid-write never leaves a broken checkpoint behind. The
+best individual so far is exported in the same pickle format the
+postprocessing scripts read.
+"""
+import os
+import pickle
+import random
+import time
+import numpy as np
+
+def atomic_pickle(obj, path):
+    """
+    Pickles an object to a temporary file and renames it into place.
+    :param obj: The object to serialize.
+    :param path: The destination path.
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'wb') as f:
+        pickle.dump(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def load_checkpoint(path):
+    """
+    Loads a checkpoint written by Checkpointer.
+    :param path: The checkpoint file.
+    :returns: The checkpoint dictionary.
+    """
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+def restore_random_state(checkpoint):
+    """
+    Restores the random and NumPy generator states of a checkpoint.
+    :param checkpoint: The checkpoint dictionary.
+    """
+    random.setstate(checkpoint['random_state'])
+    np.random.set_state(checkpoint['numpy_state'])
+
+class Checkpointer:
+    '''This class decides when a run is due for a checkpoint and writes
+    it, every `every` generations and/or every `seconds` seconds. On each
+    checkpoint the best individual is also exported to `best_path`. With
+    both intervals off no checkpoint is written; the loop's final save
+    then only exports the best individual.
+    '''
+
+    def __init__(self, path, every=None, seconds=None, best_path=None):
+        self.path = path
+        self.every = every
+        self.seconds = seconds
+        self.best_path = best_path
+        self.last_time = time.time()
+
+    def due(self, gen):
+        """
+        Checks whether a checkpoint should be written after a generation.
+        :param gen: The generation just completed.
+        :returns: True when either interval has passed.
+        """
+        if self.every and gen % self.every == 0:
+            return True
+        return bool(self.seconds) and \
+               time.time() - self.last_time >= self.seconds
+
+    def save(self, gen, population, halloffame, logbook, stopping=None):
+        """
+        Writes a checkpoint, if checkpoints are on, and exports the best
+        individual so far.
+        :param gen: The generation just completed.
+        :param population: The current population.
+        :param halloffame: The hall of fame.
+        :param logbook: The logbook so far.
+        :param stopping: The optional EarlyStopping object.
+        """
+        if self.every or self.seconds:
+            checkpoint = {'generation': gen,
+                          'population': population,
+                          'halloffame': halloffame,
+                          'logbook': logbook,
+                          'stopping': stopping,
+                          'random_state': random.getstate(),
+                          'numpy_state': np.random.get_state()}
+            atomic_pickle(checkpoint, self.path)
+        if self.best_path is not None and halloffame is not None \
+                and len(halloffame) > 0:
+            atomic_pickle(halloffame[0], self.best_path)
+        self.last_time = time.time()
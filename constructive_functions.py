@@ -0,0 +1,44 @@
+"""
+These functions are a fast alternative to the genetic algorithm for
+quick what-if runs. Each restart clusters the clubs with capacitated
+k-means into groups of exactly the sizes the grouping function uses
+(as many fives as possible, then fours), writes the clusters in the
+permutation layout and polishes the result with the same local search
+the memetic step uses. The best restart is kept, so the answer has the
+same permutation format as a genetic algorithm run and the
+postprocessing scripts can read it unchanged.
+"""
+import numpy as np
+from evaluation_functions import batch_average_distance
+from local_search_functions import improve_ordering
+from seeding_functions import capacitated_kmeans, labels_to_ordering
+
+ENGINES = ('ga', 'kmeans')
+
+def constructive_orderings(locations, distances, layout, sizes, restarts=5,
+                           neighbors=None, max_moves=None,
+                           objective='sequence', rng=np.random):
+    """
+    Builds and polishes one ordering per restart.
+    :param locations: An (n, 2) coordinate array.
+    :param distances: The square distance matrix.
+    :param layout: The layout from group_layout.
+    :param sizes: The group sizes in layout order from group_sizes.
+    :param restarts: The number of k-means starts.
+    :param neighbors: An optional nearest neighbor table for the swaps.
+    :param max_moves: The maximum swaps per restart (default 10 per club).
+    :param objective: 'sequence' or 'tour'.
+    :param rng: The random generator.
+    :returns: A list of (ordering, score) tuples in restart order.
+    """
+    if max_moves is None:
+        max_moves = 10 * len(locations)
+    results = []
+    for _ in range(restarts):
+        labels = capacitated_kmeans(locations, sizes, rng=rng)
+        ordering = labels_to_ordering(labels, np.asarray(locations), sizes)
+        improve_ordering(ordering, distances, layout, neighbors, max_moves)
+        score = batch_average_distance(ordering, distances, layout,
+                                       objective)[0]
+        results.append((ordering, score))
+    return results
@@ -0,0 +1,161 @@
+"""
+These functions build and cache the pairwise distance matrices used
+by the realignment genetic algorithms. The matrix is built in one
+vectorized pass (in row blocks to bound memory for large districts)
+instead of a double loop over club pairs. The cache is keyed on a
+content hash of the source file and the metric, so any change to the
+input rebuilds it. The cache is a .npy file of coordinates, a
+memory-mappable float32 .npy distance matrix and a small JSON header
+with the key, shape and dtype.
+Locations are (long, lat) pairs in degrees.
+"""
+import hashlib
+import json
+import os
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+METRICS = ('euclidean', 'haversine')
+
+# Cached distances are stored at half the size of float64. Scores are
+# still added up in float64.
+DISTANCE_DTYPE = 'float32'
+CACHE_FORMAT = 1
+
+def file_hash(path):
+    """
+    Calculates the SHA-256 of a file's contents.
+    :param path: The file to hash.
+    :returns: The hex digest or None if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def pairwise_distances(locations, metric='euclidean', block_size=1024):
+    """
+    Builds the square distance matrix for a set of locations.
+    :param locations: An (n, 2) array of (long, lat) pairs.
+    :param metric: 'euclidean' for raw degrees (the original
+                   behaviour) or 'haversine' for great circle km.
+    :param block_size: The number of rows computed at a time.
+    :returns: An (n, n) float64 distance matrix.
+    """
+    if metric not in METRICS:
+        raise ValueError(f'Unknown metric {metric}. Use one of {METRICS}.')
+    locations = np.asarray(locations, dtype='float32')
+    count = len(locations)
+    distances = np.zeros((count, count))
+    if metric == 'haversine':
+        radians = np.radians(locations.astype('float64'))
+        long, lat = radians[:, 0], radians[:, 1]
+        cos_lat = np.cos(lat)
+    for start in range(0, count, block_size):
+        rows = slice(start, min(start + block_size, count))
+        if metric == 'euclidean':
+            diff = locations[None, :, :] - locations[rows, None, :]
+            distances[rows] = np.sqrt(np.sum(diff * diff, axis=-1))
+        else:
+            half_dlat = np.sin((lat[None, :] - lat[rows, None]) / 2)
+            half_dlong = np.sin((long[None, :] - long[rows, None]) / 2)
+            a = half_dlat ** 2 + \
+                cos_lat[rows, None] * cos_lat[None, :] * half_dlong ** 2
+            distances[rows] = 2 * EARTH_RADIUS_KM * \
+                              np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    np.fill_diagonal(distances, 0)
+    return distances
+
+def nearest_neighbors(distances, k, block_size=1024):
+    """
+    Builds the k-nearest-neighbor table of a distance matrix.
+    :param distances: The square distance matrix.
+    :param k: The number of neighbors per location (capped at n - 1).
+    :param block_size: The number of rows ranked at a time.
+    :returns: An (n, k) index array, nearest first, excluding self.
+    """
+    count = len(distances)
+    k = min(k, count - 1)
+    neighbors = np.empty((count, k), dtype=np.intp)
+    for start in range(0, count, block_size):
+        rows = np.arange(start, min(start + block_size, count))
+        block = np.array(distances[rows], dtype='float64')
+        block[np.arange(len(rows)), rows] = np.inf
+        nearest = np.argpartition(block, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(block, nearest, axis=1),
+                           axis=1, kind='stable')
+        neighbors[rows] = np.take_along_axis(nearest, order, axis=1)
+    return neighbors
+
+def cache_key(source_path, metric):
+    """
+    Makes the key that identifies a cached distance matrix.
+    :param source_path: The input file the locations are read from.
+    :param metric: The distance metric.
+    :returns: A dictionary of source name, content hash and metric.
+    """
+    return {'source': os.path.basename(source_path),
+            'sha256': file_hash(source_path),
+            'metric': metric}
+
+def load_cache(locations_path, distances_path, header_path, key):
+    """
+    Loads cached locations and distances if they match the key. The
+    distances are memory-mapped read-only, so loading is instant and
+    processes reading the same file share its pages. When the source
+    file is missing the cache is trusted for the metric.
+    :returns: A (locations, distances) tuple or None on a miss.
+    """
+    try:
+        with open(header_path) as f:
+            header = json.load(f)
+        if header['format'] != CACHE_FORMAT or \
+                header['metric'] != key['metric']:
+            return None
+        if key['sha256'] is not None and header['sha256'] != key['sha256']:
+            return None
+        locations = np.load(locations_path)
+        distances = np.load(distances_path, mmap_mode='r')
+    except (OSError, IOError, ValueError, KeyError):
+        return None
+    if len(locations) == 0 or \
+            list(distances.shape) != header['shape'] or \
+            str(distances.dtype) != header['dtype'] or \
+            len(distances) != len(locations):
+        return None
+    return locations, distances
+
+def save_array(array, path):
+    """
+    Writes an array to a .npy file through a temporary name.
+    :param array: The array.
+    :param path: The destination path.
+    """
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'wb') as f:
+        np.save(f, np.ascontiguousarray(array))
+    os.replace(temp_path, path)
+
+def save_cache(locations, distances, locations_path, distances_path,
+               header_path, key):
+    """
+    Writes the locations and distances as .npy files (the distances as
+    DISTANCE_DTYPE) and a JSON header with the key, shape and dtype.
+    The header is written last so a partial write is a cache miss.
+    """
+    for path in (locations_path, distances_path, header_path):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+    if os.path.exists(header_path):
+        os.remove(header_path)
+    distances = np.asarray(distances, dtype=DISTANCE_DTYPE)
+    save_array(np.asarray(locations, dtype='float32'), locations_path)
+    save_array(distances, distances_path)
+    header = dict(key, format=CACHE_FORMAT, shape=list(distances.shape),
+                  dtype=str(distances.dtype))
+    with open(header_path, 'w') as f:
+        json.dump(header, f, indent=2)
@@ -1,19 +1,17 @@
 import numpy as np
 import pandas as pd
 import pickle
-import geopandas as gpd
+import sys
 from grouping_functions import select_grouping_function
 from assignment_functions import select_assignment_function
+from gis_functions import district_layers, write_layers
 
-# Load area index and locations
+# Load area index
 with open('data/best_areas_index.pkl', 'rb') as f:  
     best_index = pickle.load(f)
 
-with open('data/loc.pickle', 'rb') as f:  
-    loc = pickle.load(f)
-
 # Convert to dataframe for merging
-best_df = pd.DataFrame(best_index, columns = ['club_index'])
+best_df = pd.DataFrame(list(best_index), columns = ['club_index'])
 
 # Select and use assignment function
 assign_areas = select_assignment_function(len(best_index))
@@ -41,25 +39,11 @@ area_centroids = best_dist.drop('club_no', axis=1).groupby('area').mean()
 with open('data/area_centroids.pkl', 'wb') as f:  
     pickle.dump(area_centroids, f)
 
-# Create GeoDataFrame for GIS manual plotting
-g_clubs = gpd.GeoDataFrame(best_dist, 
-                           geometry=gpd.points_from_xy(best_dist.long, best_dist.lat),
-                           crs="EPSG:4326")
-
-g_clubs.to_file('data/clubs_with_areas.shp')
-print('clubs_with_areas.shp created.')
-
-# Dissolve groups the points into single objects which are a list of points
-areas = g_clubs.dissolve(by='area')['geometry']
-
-# Make boundary file
-area_poly = areas.convex_hull.buffer(0.02)
-area_boundaries = area_poly.boundary
-
-# Export these for manual inspection
-area_boundaries.to_file('data/area_boundaries.shp')
-
-print('area_boundaries.shp created.')
+# Write the clubs and area boundaries for manual inspection. Pass a
+# .gpkg path to get a GeoPackage instead (needs geopandas).
+gis_path = sys.argv[1] if len(sys.argv) > 1 else 'data/areas.geojson'
+write_layers(gis_path, district_layers(best_dist))
+print(f'{gis_path} created.')
 print()
 print('Manually inspect area assignments before proceeding to division realignment.')
 print('Edit area_clubs.csv and recalculate centroids for input into next step.')
\ No newline at end of file
@@ -3,9 +3,18 @@
     the zip codes.'''
 
 import sys
+import os
+import json
 import numpy as np
 import pandas as pd 
-import zipcodes
+
+# Resolved zip codes persist here between runs. Entries can be added
+# by hand for zip codes the zipcodes package does not know.
+ZIP_CACHE = 'data/zip_cache.json'
+
+# The compiled zip code table, built once by build_zip_index so runs
+# never need to import the zipcodes package.
+ZIP_INDEX = 'data/zip_index.npz'
 
 def import_club_zips(filename):
     ''' This function takes in a csv. The club number should be in a
@@ -30,11 +39,123 @@ def import_club_zips(filename):
         print()
         return
 
-def geocode_dataframe(df):
+def normalize_zip(zip_code):
+    '''This turns a zip code read as an integer, float or string
+       (including ZIP+4) into a five digit string.'''
+    text = str(zip_code).strip()
+    if text.endswith('.0'):
+        text = text[:-2]
+    return text.split('-')[0].zfill(5)
+
+def load_zip_cache(path=ZIP_CACHE):
+    '''This reads the resolved zip codes as a dictionary of zip code
+       to [lat, long]. A missing or unreadable file is an empty cache.'''
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_zip_cache(cache, path=ZIP_CACHE):
+    '''This writes the resolved zip codes through a temporary file.'''
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(f'{path}.tmp', path)
+
+def build_zip_index(path=ZIP_INDEX):
+    '''This compiles the zipcodes package data once into a sorted
+       binary index: int32 zip codes and float32 [lat, long] rows.
+       It is the only function that imports zipcodes.
+       :returns: The sorted zip codes and their coordinates.'''
+    import zipcodes
+    records = zipcodes.list_all()
+    zips = np.array([int(z['zip_code']) for z in records], dtype=np.int32)
+    coordinates = np.array([[float(z['lat']), float(z['long'])]
+                            for z in records], dtype=np.float32)
+    # Sort and keep the first record of any repeated zip code
+    zips, first = np.unique(zips, return_index=True)
+    coordinates = coordinates[first]
+    if len(zips) == 0:
+        raise ValueError('The zipcodes package returned no zip codes.')
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f'{path}.tmp.npz'
+    np.savez(temp_path, zips=zips, coordinates=coordinates)
+    os.replace(temp_path, path)
+    print(f'{len(zips)} zip codes written to {path}.')
+    return zips, coordinates
+
+def zip_index(path=ZIP_INDEX):
+    '''This loads the prebuilt zip code index, building it first if
+       it does not exist yet.
+       :returns: The sorted zip codes and their coordinates.'''
+    if not os.path.exists(path):
+        return build_zip_index(path)
+    with np.load(path) as index:
+        return index['zips'], index['coordinates']
+
+def lookup_zips(zips, index):
+    '''This looks up a whole array of five digit zip codes at once
+       with a binary search of the sorted index.
+       :returns: An (n, 2) float64 array of [lat, long] with NaN rows
+                 for zip codes not found, and the boolean found mask.'''
+    keys, coordinates = index
+    codes = pd.to_numeric(pd.Series(zips, dtype=object), errors='coerce') \
+              .fillna(-1).to_numpy(dtype=np.int64)
+    result = np.full((len(codes), 2), np.nan)
+    if len(keys) == 0:
+        return result, np.zeros(len(codes), dtype=bool)
+    positions = np.searchsorted(keys, codes)
+    positions = np.minimum(positions, len(keys) - 1)
+    found = keys[positions] == codes
+    result[found] = coordinates[positions[found]]
+    return result, found
+
+def resolve_zips(zips, cache, index=None):
+    '''This adds every zip code missing from the cache to it, looking
+       the distinct ones up together. The index is only loaded if
+       something is missing.
+       :returns: The sorted zip codes that could not be resolved.'''
+    missing = sorted(set(zips) - set(cache))
+    if not missing:
+        return []
+    if index is None:
+        index = zip_index()
+    coordinates, found = lookup_zips(missing, index)
+    # Rounded past float32 precision so the cache stays readable
+    coordinates = np.round(coordinates, 5).tolist()
+    for zip_code, location, ok in zip(missing, coordinates, found):
+        if ok:
+            cache[zip_code] = location
+    return [zip_code for zip_code, ok in zip(missing, found) if not ok]
+
+def geocode_dataframe(df, cache_path=ZIP_CACHE, index=None,
+                      output='club_zips.csv'):
     '''This takes in a dataframe and geocodes it using the zip code
-       which can be either a string or an integer.'''
-    df['lat'] = [zipcodes.matching[i][0]['lat'] for i in df['zip']]
-    df['long'] = [zipcodes.matching[i][0]['long'] for i in df['zip']]
+       which can be either a string or an integer. Clubs whose zip
+       code cannot be resolved are reported together and left out.
+       The result is written to output unless it is None.'''
+    total = len(df)
+    df['zip'] = df['zip'].map(normalize_zip)
+    cache = load_zip_cache(cache_path)
+    unresolved = resolve_zips(df['zip'].unique(), cache, index)
+    save_zip_cache(cache, cache_path)
+
+    if unresolved:
+        missing = df[df['zip'].isin(unresolved)]
+        print()
+        print(f'WARNING: {len(unresolved)} zip codes could not be geocoded '
+              f'({len(missing)} clubs):')
+        for zip_code, clubs in missing.groupby('zip')['club_no']:
+            print(f'  {zip_code}: clubs {", ".join(map(str, clubs))}')
+        print(f'Add them to {cache_path} as "zip": [lat, long] and rerun.')
+        print()
+        df = df[~df['zip'].isin(unresolved)].copy()
+
+    df['lat'] = [cache[z][0] for z in df['zip']]
+    df['long'] = [cache[z][1] for z in df['zip']]
     df['long'] = df['long'].astype(float)
     df['lat'] = df['lat'].astype(float)
     
@@ -44,14 +165,18 @@ def geocode_dataframe(df):
     df['long'] += np.random.normal(0, 0.0009, len(df))
     df['lat'] += np.random.normal(0, 0.0009, len(df))
     
-    df.to_csv('club_zips.csv', index=False)
-    print(f'{len(df.lat)} clubs geocoded out of {len(df)} clubs.')
+    if output is not None:
+        df.to_csv(output, index=False)
+    print(f'{len(df.lat)} clubs geocoded out of {total} clubs.')
     return df
 
 if __name__ == "__main__":
     '''Call the functions along with the file:
-       ::param sys.argv[1]:: filename for club zips
+       ::param sys.argv[1]:: filename for club zips, or --build-zip-index
     '''
+    if sys.argv[1] == '--build-zip-index':
+        build_zip_index()
+        sys.exit()
 
     print()
     print("Initializing preprocessing...")
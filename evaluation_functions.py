@@ -0,0 +1,242 @@
+"""
+These functions score a whole population of district orderings
+in one call. Instead of slicing each individual into areas and
+walking the distance matrix in Python, the population is stacked
+into a 2-D index array and every leg of every area cycle is
+gathered from the distance matrix with NumPy fancy indexing.
+The group layout (which positions of the permutation belong to
+which area or division) is precomputed once from the grouping
+function chosen by select_grouping_function.
+The incremental functions keep each individual's per-group totals
+and the ordering they were scored from, so after mutation or
+crossover only the groups whose positions changed are re-scored.
+Two objectives are available for a group:
+- sequence: the closed cycle in the order the members are listed
+- tour: the shortest closed cycle over the members, whatever their
+  order, found by gathering every distinct cycle from a precomputed
+  table (3 for four members, 12 for five) in one step
+"""
+from functools import lru_cache
+from itertools import permutations
+import numpy as np
+
+OBJECTIVES = ('sequence', 'tour')
+
+def group_sizes(grouping_function, size):
+    """
+    Runs the grouping function once over the positions of the
+    permutation to record how many members each group gets.
+    :param grouping_function: A function from select_grouping_function.
+    :param size: The number of clubs (or areas) in the permutation.
+    :returns: An integer array of group sizes in permutation order.
+    """
+    return np.array([len(group) for group in grouping_function(range(size))],
+                    dtype=np.intp)
+
+def group_layout(grouping_function, size):
+    """
+    Precomputes the position offsets for each group size so a batch
+    evaluation only needs one gather per size (4 or 5 members).
+    :param grouping_function: A function from select_grouping_function.
+    :param size: The number of clubs (or areas) in the permutation.
+    :returns: A list of (group columns, member positions) pairs where
+              member positions is a (groups, members) index array.
+    """
+    sizes = group_sizes(grouping_function, size)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    layout = []
+    for members in np.unique(sizes):
+        columns = np.flatnonzero(sizes == members)
+        positions = starts[columns, None] + np.arange(members)
+        layout.append((columns, positions))
+    return layout
+
+def population_array(population):
+    """
+    Stacks a population into a 2-D integer array.
+    :param population: A list of individuals or an existing array.
+    :returns: A (individuals, positions) index array.
+    """
+    population = np.asarray(population, dtype=np.intp)
+    if population.ndim == 1:
+        population = population[None, :]
+    return population
+
+def cycle_distances(members, distances):
+    """
+    Calculates the closed cycle distance of groups of equal size.
+    The legs are added in the same order as the sequential area_distance
+    methods (last to first, then first to last) so the totals match the
+    per-individual scores exactly. The sum is kept in float64 whatever
+    the dtype of the matrix.
+    :param members: An index array whose last axis is the group members.
+    :param distances: The square distance matrix.
+    :returns: An array of cycle distances with the last axis dropped.
+    """
+    total = distances[members[..., -1], members[..., 0]].astype(np.float64,
+                                                                copy=False)
+    for i in range(members.shape[-1] - 1):
+        total = total + distances[members[..., i], members[..., i + 1]]
+    return total
+
+@lru_cache(maxsize=None)
+def tour_table(size):
+    """
+    Lists every distinct closed cycle over a group's member slots.
+    Rotations are removed by fixing the first slot and reversals by
+    keeping the second slot below the last.
+    :param size: The number of members.
+    :returns: A (cycles, size) array of slot orders.
+    """
+    if size < 4:
+        return np.arange(size)[None, :]
+    return np.array([(0,) + rest for rest in permutations(range(1, size))
+                     if rest[0] < rest[-1]], dtype=np.intp)
+
+def tour_distances(members, distances):
+    """
+    Calculates the shortest closed cycle distance of groups of equal
+    size by scoring every cycle in tour_table in one gather.
+    :param members: An index array whose last axis is the group members.
+    :param distances: The square distance matrix.
+    :returns: An array of shortest cycle distances.
+    """
+    cycles = members[..., tour_table(members.shape[-1])]
+    return np.min(cycle_distances(cycles, distances), axis=-1)
+
+def best_tours(members, distances):
+    """
+    Reorders the members of each group into its shortest closed cycle.
+    :param members: A (groups, size) index array.
+    :param distances: The square distance matrix.
+    :returns: The reordered (groups, size) array.
+    """
+    cycles = members[:, tour_table(members.shape[1])]
+    best = np.argmin(cycle_distances(cycles, distances), axis=1)
+    return cycles[np.arange(len(members)), best]
+
+def group_distance_function(objective):
+    """
+    Selects the group scoring function for an objective.
+    :param objective: 'sequence' or 'tour'.
+    :returns: cycle_distances or tour_distances.
+    """
+    if objective == 'sequence':
+        return cycle_distances
+    if objective == 'tour':
+        return tour_distances
+    raise ValueError(f'Unknown objective {objective}. Use one of {OBJECTIVES}.')
+
+def batch_group_distances(population, distances, layout,
+                          objective='sequence'):
+    """
+    Calculates the distance of every group of every individual.
+    :param population: A list of individuals or a 2-D index array.
+    :param distances: The square distance matrix.
+    :param layout: The layout from group_layout.
+    :param objective: 'sequence' or 'tour'.
+    :returns: A (individuals, groups) array of group distances.
+    """
+    group_distances = group_distance_function(objective)
+    population = population_array(population)
+    group_count = sum(len(columns) for columns, _ in layout)
+    totals = np.empty((len(population), group_count))
+    for columns, positions in layout:
+        totals[:, columns] = group_distances(population[:, positions],
+                                             distances)
+    return totals
+
+def batch_average_distance(population, distances, layout,
+                           objective='sequence'):
+    """
+    Gets the average group distance for every individual at once.
+    :param population: A list of individuals or a 2-D index array.
+    :param distances: The square distance matrix.
+    :param layout: The layout from group_layout.
+    :param objective: 'sequence' or 'tour'.
+    :returns: A 1-D array of mean distances in population order.
+    """
+    return np.mean(batch_group_distances(population, distances, layout,
+                                         objective), axis=1)
+
+def group_starts(layout):
+    """
+    Gets the first permutation position of every group in group order.
+    :param layout: The layout from group_layout.
+    :returns: An integer array of group start positions.
+    """
+    starts = np.empty(sum(len(columns) for columns, _ in layout),
+                      dtype=np.intp)
+    for columns, positions in layout:
+        starts[columns] = positions[:, 0]
+    return starts
+
+def changed_groups(population, scored, starts):
+    """
+    Flags the groups that have at least one position that differs from
+    the ordering the group totals were scored from.
+    :param population: A 2-D index array of current orderings.
+    :param scored: A 2-D index array of previously scored orderings.
+    :param starts: The group start positions from group_starts.
+    :returns: A (individuals, groups) boolean array.
+    """
+    changed = (population != scored).astype(np.intp)
+    return np.add.reduceat(changed, starts, axis=1) > 0
+
+def rescore_groups(population, totals, changed, distances, layout,
+                   objective='sequence'):
+    """
+    Replaces the totals of the changed groups only.
+    :param population: A 2-D index array of current orderings.
+    :param totals: The (individuals, groups) totals to update in place.
+    :param changed: The boolean array from changed_groups.
+    :param distances: The square distance matrix.
+    :param layout: The layout from group_layout.
+    :param objective: 'sequence' or 'tour'.
+    :returns: The updated totals.
+    """
+    group_distances = group_distance_function(objective)
+    for columns, positions in layout:
+        rows, picks = np.nonzero(changed[:, columns])
+        if len(rows) > 0:
+            members = population[rows[:, None], positions[picks]]
+            totals[rows, columns[picks]] = group_distances(members, distances)
+    return totals
+
+def incremental_average_distance(population, distances, layout, starts,
+                                 objective='sequence'):
+    """
+    Gets the average group distance for every individual, re-scoring
+    only the groups that changed since the individual (or the parent it
+    was cloned from) was last scored. Individuals without cached totals
+    are scored in full. The mean is taken over the updated group totals,
+    so the result matches a full evaluation exactly.
+    :param population: A list of DEAP individuals. Their group_totals
+                       and scored_ordering attributes are updated.
+    :param distances: The square distance matrix.
+    :param layout: The layout from group_layout.
+    :param starts: The group start positions from group_starts.
+    :param objective: 'sequence' or 'tour'.
+    :returns: A 1-D array of mean distances in population order.
+    """
+    orderings = population_array(population)
+    totals = np.empty((len(orderings), len(starts)))
+    warm = [i for i, ind in enumerate(population)
+            if getattr(ind, 'scored_ordering', None) is not None]
+    warm_set = set(warm)
+    fresh = [i for i in range(len(population)) if i not in warm_set]
+
+    if fresh:
+        totals[fresh] = batch_group_distances(orderings[fresh], distances,
+                                              layout, objective)
+    if warm:
+        scored = np.array([population[i].scored_ordering for i in warm])
+        warm_totals = np.array([population[i].group_totals for i in warm])
+        changed = changed_groups(orderings[warm], scored, starts)
+        totals[warm] = rescore_groups(orderings[warm], warm_totals, changed,
+                                      distances, layout, objective)
+
+    for ind, ordering, total in zip(population, orderings, totals):
+        ind.scored_ordering = ordering.copy()
+        ind.group_totals = total.copy()
+    return np.mean(totals, axis=1)
@@ -1,11 +1,23 @@
-import csv
-import pickle
-import os
-from math import ceil, pi
+from math import ceil
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from grouping_functions import select_grouping_function
+from evaluation_functions import group_layout, group_starts, group_sizes, \
+                                 batch_average_distance, \
+                                 incremental_average_distance, \
+                                 tour_distances, OBJECTIVES
+from distance_functions import pairwise_distances, cache_key, load_cache, \
+                               save_cache, nearest_neighbors, DISTANCE_DTYPE
+from local_search_functions import improve_ordering
+from cache_functions import partition_keys
+from operator_functions import position_groups, mut_neighbor_swap, \
+                               cx_neighbor_region
+from seeding_functions import seed_orderings
+from constructive_functions import constructive_orderings
+
+# Coordinates, distance matrix and header of the distance cache
+CACHE_PATHS = ('data/locations.npy', 'data/distances.npy',
+               'data/distances.json')
 
 class DistrictRealignment:
     '''This class encapsulates the district realignment problem which
@@ -17,20 +29,44 @@ class DistrictRealignment:
     The class uses files created with the district_preprocessing.py file.
     '''
 
-    def __init__(self):
+    def __init__(self, metric='euclidean', objective='sequence',
+                 locations=None, verbose=True):
         """
         Creates an instance of a District Realignment
+        :param metric: 'euclidean' (degrees) or 'haversine' (km)
+        :param objective: 'sequence' scores each area as a cycle in the
+                          listed order; 'tour' scores its shortest cycle
+        :param locations: Optional (n, 2) long/lat array of the clubs.
+                          When given, the distances are computed in
+                          memory instead of read from the data files.
+        :param verbose: Print the counts and the selected grouping
+                        function (off for the many small region problems).
         """
+        if objective not in OBJECTIVES:
+            raise ValueError(f'Unknown objective {objective}. '
+                             f'Use one of {OBJECTIVES}.')
         # initialize instance variables
+        self.metric = metric
+        self.objective = objective
+        self.verbose = verbose
         self.locations = []
         self.distances = []
         self.club_count = 0
         self.area_count = 0
         self.get_areas_function = None
+        self.area_layout = None
+        self.area_starts = None
+        self.area_groups = None
+        self.neighbors = {}
+        self.fitness_cache = None
 
         # initialize the data and function
-        self.__init_data()
+        if locations is None:
+            self.__init_data()
+        else:
+            self.__init_locations(locations)
         self.__init_select_area_grouping_function()
+        self.__init_area_layout()
     
     def __len__(self):
         """
@@ -40,55 +76,58 @@ class DistrictRealignment:
         """
         return self.club_count
 
+    def __init_locations(self, locations):
+        """
+        Uses in-memory locations without touching the cache files.
+        """
+        self.locations = np.asarray(locations, dtype='float32')
+        self.distances = pairwise_distances(self.locations, self.metric) \
+                             .astype(DISTANCE_DTYPE)
+        self.__init_counts()
+
     def __init_data(self):
         """
         Get or call to create serialized data for access during optimization.
+        The cache is only used when it was built from the current
+        club_zips.csv with the same metric.
         """
-        try:
-            with open('data/loc.pickle', 'rb') as f:  
-                self.locations = pickle.load(f)
-            with open('data/dist.pickle', 'rb') as f:
-                self.distances = pickle.load(f)
-        except (OSError, IOError):
-            pass
-
-        if not (len(self.locations) > 0) or (len(self.distances) > 0):
-            print("Data not previously serialized. Creating now.")
-            self.__create_data()
+        key = cache_key('club_zips.csv', self.metric)
+        cached = load_cache(*CACHE_PATHS, key)
+        if cached is None:
+            if self.verbose:
+                print("Data not previously serialized or out of date. Creating now.")
+            self.__create_data(key)
+            # Read it back memory-mapped, exactly as a cache hit would
+            cached = load_cache(*CACHE_PATHS, key)
+        self.locations, self.distances = cached
+        self.__init_counts()
 
+    def __init_counts(self):
+        """
+        Sets the club and area counts from the locations.
+        """
         # Set the district size
         self.club_count = len(self.locations)
         # Calculate number of areas (based on maximizing for 5 clubs)
         self.area_count = ceil(self.club_count / 5)
-        print(f'With {self.club_count} clubs, there will be {self.area_count} areas.')
+        if self.verbose:
+            print(f'With {self.club_count} clubs, there will be {self.area_count} areas.')
 
-    def __create_data(self):
+    def __create_data(self, key):
         '''
         This serializes the locations and 
         distances for algorithm use.
+        :param key: The cache key from cache_key.
         '''
         df = pd.read_csv('club_zips.csv')
-        self.locations = [np.asarray([row[4], row[3]], dtype='float32') \
-                            for row in df.itertuples()]
-        
+        self.locations = df[['long', 'lat']].to_numpy(dtype='float32')
         self.club_count = len(self.locations)
-        
-        # Initialize matrix for distance values
-        self.distances = np.zeros((self.club_count, self.club_count))
-        # Populate matrix with every pairwise distance
-        for i in range(self.club_count):
-            for j in range(i+1, self.club_count):
-                distance = np.linalg.norm(self.locations[j] - self.locations[i])
-                self.distances[i][j] = distance
-                self.distances[j][i] = distance
-
-        # Serialize locations and qualities
-        if not os.path.exists("data"):
-            os.makedirs("data")
-        with open('data/loc.pickle', 'wb') as f:  
-	        pickle.dump(self.locations, f)
-        with open('data/dist.pickle', 'wb') as f:  
-	        pickle.dump(self.distances, f)
+
+        # Populate matrix with every pairwise distance in one pass
+        self.distances = pairwise_distances(self.locations, self.metric)
+
+        # Serialize locations and distances with their cache key
+        save_cache(self.locations, self.distances, *CACHE_PATHS, key)
 
     def __init_select_area_grouping_function(self):
         '''
@@ -98,7 +137,18 @@ class DistrictRealignment:
         that separately.
         '''
         self.get_areas_function = select_grouping_function(self.club_count)
-        print(f'Selected function: {self.get_areas_function}')
+        if self.verbose:
+            print(f'Selected function: {self.get_areas_function}')
+
+    def __init_area_layout(self):
+        '''
+        This precomputes the permutation positions of each area so
+        whole populations can be scored with one gather per area size.
+        '''
+        self.area_layout = group_layout(self.get_areas_function,
+                                        self.club_count)
+        self.area_starts = group_starts(self.area_layout)
+        self.area_groups = position_groups(self.area_layout, len(self))
 
     def get_areas(self, clubs_list):
         '''
@@ -112,14 +162,17 @@ class DistrictRealignment:
         ''' 
         Calculates the distance between clubs in an area sequentially.
         To account for circular vs linear placement, circle back to the 
-        first club from the last.
+        first club from the last. With the tour objective the shortest
+        cycle over the clubs is used instead.
         :param area: The area to be measured consisting of 4 or 5 clubs.
         :return: A total distance calculation
         '''
+        if self.objective == 'tour':
+            return tour_distances(np.asarray(area), self.distances)
         # Distance between last and first item to initialize
-        distance = self.distances[area[-1]][area[0]]
+        distance = float(self.distances[area[-1]][area[0]])
         for i in range(len(area) - 1):
-            distance += self.distances[area[i]][area[i + 1]]
+            distance += float(self.distances[area[i]][area[i + 1]])
         return distance
 
     def area_average_distance(self, district):
@@ -134,4 +187,119 @@ class DistrictRealignment:
         '''
         Evaluation function returning average distance scores.
         '''
-        return self.area_average_distance(district), 
+        return self.area_average_distance(district),
+
+    def evaluate_population(self, population):
+        '''
+        Batch evaluation function scoring a whole generation at once.
+        The scores match evaluate_district for every individual.
+        :param population: A list of individuals or a 2-D index array.
+        :return: A list of fitness tuples in population order.
+        '''
+        scores = batch_average_distance(population, self.distances,
+                                        self.area_layout, self.objective)
+        return [(score,) for score in scores]
+
+    def evaluate_population_incremental(self, population):
+        '''
+        Batch evaluation function that keeps per-area subtotals with
+        each individual and only re-scores the areas whose positions
+        changed through mutation or crossover.
+        :param population: A list of DEAP individuals.
+        :return: A list of fitness tuples in population order.
+        '''
+        scores = incremental_average_distance(population, self.distances,
+                                              self.area_layout,
+                                              self.area_starts,
+                                              self.objective)
+        return [(score,) for score in scores]
+
+    def partition_keys(self, population):
+        '''
+        Makes fitness cache keys that are the same for every ordering
+        that decodes to the same areas (in any area order, with the
+        members of each area rotated or reversed, or in any order with
+        the tour objective).
+        :param population: A list of individuals or a 2-D index array.
+        :return: A list of keys in population order.
+        '''
+        return partition_keys(population, self.area_layout,
+                              cyclic=self.objective == 'sequence')
+
+    def neighbor_table(self, k=10):
+        '''
+        Gets the k-nearest-neighbor table of the clubs, built on first use.
+        :param k: The number of neighbors per club.
+        :return: An (n, k) index array, nearest first.
+        '''
+        k = min(k, len(self) - 1)
+        if k not in self.neighbors:
+            self.neighbors[k] = nearest_neighbors(self.distances, k)
+        return self.neighbors[k]
+
+    def mutate_neighbors(self, individual, indpb, k=10):
+        '''
+        Mutation that swaps clubs only with one of their k nearest
+        neighbors in another area.
+        :param individual: The individual, changed in place.
+        :param indpb: The probability of moving each club.
+        :param k: The number of nearest neighbors considered.
+        :return: A tuple of one individual.
+        '''
+        return mut_neighbor_swap(individual, self.neighbor_table(k),
+                                 self.area_groups, indpb)
+
+    def mate_neighbors(self, ind1, ind2, k=10):
+        '''
+        Crossover that exchanges where a random club and its k nearest
+        neighbors are placed between two individuals.
+        :param ind1: The first individual, changed in place.
+        :param ind2: The second individual, changed in place.
+        :param k: The number of nearest neighbors in the region.
+        :return: A tuple of two individuals.
+        '''
+        return cx_neighbor_region(ind1, ind2, self.neighbor_table(k))
+
+    def seed_orderings(self, count):
+        '''
+        Builds orderings from geographic heuristics (space-filling
+        curves, sweeps and capacity-constrained k-means) that already
+        decode into compact areas.
+        :param count: The number of orderings.
+        :return: A list of permutation index arrays.
+        '''
+        return seed_orderings(self.locations,
+                              group_sizes(self.get_areas_function, len(self)),
+                              count)
+
+    def constructive_orderings(self, restarts=5, k=10):
+        '''
+        Builds areas without the genetic algorithm: capacitated k-means
+        followed by local search, once per restart.
+        :param restarts: The number of k-means starts.
+        :param k: The number of nearest neighbors the swaps consider.
+        :return: A list of (ordering, score) tuples.
+        '''
+        return constructive_orderings(self.locations, self.distances,
+                                      self.area_layout,
+                                      group_sizes(self.get_areas_function,
+                                                  len(self)),
+                                      restarts, self.neighbor_table(k),
+                                      objective=self.objective)
+
+    def local_search(self, individual, max_moves=100, k=10):
+        '''
+        Memetic improvement step. Swaps clubs between areas (limited to
+        each one's k nearest neighbors) and reorders members inside
+        areas while that shortens the distances. The individual is
+        changed in place and its fitness is invalidated if it moved.
+        :param individual: The individual to improve.
+        :param max_moves: The maximum number of swaps between areas.
+        :param k: The number of nearest neighbors considered.
+        :return: The number of moves applied.
+        '''
+        moves = improve_ordering(individual, self.distances,
+                                 self.area_layout, self.neighbor_table(k), max_moves)
+        if moves and hasattr(individual, 'fitness'):
+            del individual.fitness.values
+        return moves
@@ -0,0 +1,244 @@
+"""
+These functions run the generational loop for the realignment
+genetic algorithms. They follow DEAP's eaSimple but hand every
+generation's invalid individuals to toolbox.evaluate_population
+in one call instead of mapping toolbox.evaluate over them.
+The loop can also stop early on a stall, a small relative
+improvement or a wall-clock budget (see EarlyStopping), write
+periodic checkpoints and resume from one. With toolbox.local_search
+registered, the best offspring can be polished every k generations
+(a memetic algorithm). A GenerationLogger can record sampled
+generations in place of printing the logbook, and a PhaseProfiler
+can time each phase of a generation.
+"""
+import time
+from collections import deque
+from contextlib import nullcontext
+from deap import algorithms
+from deap import tools
+from checkpoint_functions import restore_random_state
+
+class EarlyStopping:
+    '''This class holds the stopping rules for a minimizing run. Each
+    generation it is updated with the best score found so far and
+    returns the name of the first rule that fires, if any:
+    - stall: the best score has not improved for `patience` generations
+    - min_improvement: the best score improved by less than the relative
+      `min_improvement` over the last `window` generations
+    - time_budget: more than `time_budget` seconds have passed
+    A rule set to None is disabled.
+    '''
+
+    def __init__(self, patience=None, min_improvement=None, window=1000,
+                 time_budget=None):
+        self.patience = patience
+        self.min_improvement = min_improvement
+        self.window = window
+        self.time_budget = time_budget
+        self.history = deque(maxlen=window + 1)
+        self.best = None
+        self.stall = 0
+        self.reason = None
+        self.start_time = None
+
+    def start(self):
+        """
+        Starts the wall clock for the time budget.
+        """
+        self.start_time = time.time()
+
+    def resume_from(self, other):
+        """
+        Continues the stall and improvement tracking of a checkpointed
+        run. The time budget restarts with the resumed run.
+        :param other: The EarlyStopping object from the checkpoint.
+        """
+        self.best = other.best
+        self.stall = other.stall
+        self.history.extend(other.history)
+
+    def update(self, best):
+        """
+        Records the best score of a generation and checks the rules.
+        :param best: The best (lowest) score found so far.
+        :returns: The name of the rule that fired or None.
+        """
+        if self.start_time is None:
+            self.start()
+        if self.best is None or best < self.best:
+            self.best = best
+            self.stall = 0
+        else:
+            self.stall += 1
+        self.history.append(best)
+
+        if self.patience is not None and self.stall >= self.patience:
+            self.reason = 'stall'
+        elif self.min_improvement is not None and \
+                len(self.history) > self.window:
+            previous = self.history[0]
+            if previous != 0 and \
+                    (previous - best) / abs(previous) < self.min_improvement:
+                self.reason = 'min_improvement'
+        if self.reason is None and self.time_budget is not None and \
+                time.time() - self.start_time >= self.time_budget:
+            self.reason = 'time_budget'
+        return self.reason
+
+def no_phase(name):
+    """
+    Stands in for PhaseProfiler.phase when the loop is not profiled.
+    :param name: The phase name (unused).
+    :returns: A context manager that does nothing.
+    """
+    return nullcontext()
+
+def evaluate_invalid(toolbox, individuals):
+    """
+    Scores the individuals without a valid fitness in one batch.
+    :param toolbox: A toolbox with evaluate_population registered.
+    :param individuals: The individuals to check.
+    :returns: The number of evaluations made.
+    """
+    invalid_ind = [ind for ind in individuals if not ind.fitness.valid]
+    if invalid_ind:
+        fitnesses = toolbox.evaluate_population(invalid_ind)
+        for ind, fit in zip(invalid_ind, fitnesses):
+            ind.fitness.values = fit
+    return len(invalid_ind)
+
+def improve_elites(toolbox, offspring, elites):
+    """
+    Applies toolbox.local_search to the best offspring and re-scores
+    the ones that changed.
+    :param toolbox: A toolbox with local_search registered.
+    :param offspring: The evaluated offspring.
+    :param elites: The number of best offspring to improve.
+    :returns: The number of evaluations made.
+    """
+    for ind in tools.selBest(offspring, elites):
+        toolbox.local_search(ind)
+    return evaluate_invalid(toolbox, offspring)
+
+def ea_simple_batched(population, toolbox, cxpb, mutpb, ngen, stats=None,
+                      halloffame=None, verbose=__debug__, stopping=None,
+                      checkpointer=None, checkpoint=None,
+                      local_search_every=0, local_search_elites=1,
+                      logger=None, profiler=None, gen_offset=0):
+    """
+    The eaSimple algorithm with batched population evaluation.
+    :param population: A list of individuals.
+    :param toolbox: A toolbox with select, mate, mutate and
+                    evaluate_population registered.
+    :param cxpb: The probability of mating two individuals.
+    :param mutpb: The probability of mutating an individual.
+    :param ngen: The number of generations.
+    :param stats: An optional Statistics object.
+    :param halloffame: An optional HallOfFame object.
+    :param verbose: Whether to print the logbook each generation.
+    :param stopping: An optional EarlyStopping object. It needs the
+                     hall of fame to track the best score, and its
+                     reason is set to 'max_generations' if no rule fires.
+    :param checkpointer: An optional Checkpointer that saves the run.
+    :param checkpoint: An optional checkpoint dictionary to resume from.
+                       Its population, hall of fame, logbook and random
+                       states replace the ones passed in.
+    :param local_search_every: Run toolbox.local_search every this many
+                               generations (0 = never).
+    :param local_search_elites: The number of best offspring improved.
+    :param logger: An optional GenerationLogger. It is flushed with
+                   every checkpoint and closed by the caller.
+    :param profiler: An optional PhaseProfiler. Its toolbox wrappers
+                     should already be installed; the loop times the
+                     hall of fame, statistics and checkpoints and adds
+                     the t_<phase> times of each generation to the
+                     logbook.
+    :param gen_offset: The generations already run before this call,
+                       for a run split into blocks (as the islands do).
+                       Generations are numbered from it, so the local
+                       search and checkpoint intervals count the whole
+                       run's generations.
+    :returns: The final population and the logbook.
+    """
+    if stopping is not None:
+        stopping.start()
+    phase = profiler.phase if profiler is not None else no_phase
+
+    if checkpoint is not None:
+        # Continue from the generation after the checkpoint
+        population[:] = checkpoint['population']
+        if halloffame is not None:
+            halloffame.clear()
+            halloffame.update(checkpoint['halloffame'])
+        logbook = checkpoint['logbook']
+        if stopping is not None and checkpoint['stopping'] is not None:
+            stopping.resume_from(checkpoint['stopping'])
+        restore_random_state(checkpoint)
+        if logger is not None:
+            logger.resume_from(logbook)
+        start_gen = checkpoint['generation'] + 1
+    else:
+        logbook = tools.Logbook()
+        logbook.header = ['gen', 'nevals'] + (stats.fields if stats else [])
+
+        nevals = evaluate_invalid(toolbox, population)
+
+        if halloffame is not None:
+            with phase('halloffame'):
+                halloffame.update(population)
+
+        with phase('statistics'):
+            record = stats.compile(population) if stats else {}
+        if profiler is not None:
+            record.update(profiler.lap())
+        logbook.record(gen=gen_offset, nevals=nevals, **record)
+        if verbose:
+            print(logbook.stream)
+        if logger is not None:
+            logger.record(gen_offset, nevals, record)
+        start_gen = gen_offset + 1
+
+    last_gen = gen_offset + ngen
+    for gen in range(start_gen, last_gen + 1):
+        # Select and vary the next generation
+        offspring = toolbox.select(population, len(population))
+        offspring = algorithms.varAnd(offspring, toolbox, cxpb, mutpb)
+
+        nevals = evaluate_invalid(toolbox, offspring)
+        if local_search_every and gen % local_search_every == 0:
+            nevals += improve_elites(toolbox, offspring, local_search_elites)
+
+        if halloffame is not None:
+            with phase('halloffame'):
+                halloffame.update(offspring)
+
+        population[:] = offspring
+
+        with phase('statistics'):
+            record = stats.compile(population) if stats else {}
+        if profiler is not None:
+            record.update(profiler.lap())
+        logbook.record(gen=gen, nevals=nevals, **record)
+        if verbose:
+            print(logbook.stream)
+
+        stop = stopping is not None and halloffame is not None and \
+               stopping.update(halloffame[0].fitness.values[0])
+        if logger is not None:
+            logger.record(gen, nevals, record, last=stop or gen == last_gen)
+
+        if checkpointer is not None and (stop or gen == last_gen or
+                                         checkpointer.due(gen)):
+            with phase('checkpoint'):
+                checkpointer.save(gen, population, halloffame, logbook,
+                                  stopping)
+            if logger is not None:
+                logger.flush()
+
+        if stop:
+            break
+
+    if stopping is not None and stopping.reason is None:
+        stopping.reason = 'max_generations'
+
+    return population, logbook
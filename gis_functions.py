@@ -0,0 +1,130 @@
+"""
+These functions make the boundary layers people inspect in GIS
+software. Each area's (or division's) boundary is the convex hull of
+its clubs grown by a buffer, worked out straight from the grouped
+coordinate arrays. The outline of a buffered convex hull in any
+direction is the club furthest that way moved out by the buffer, so
+one matrix product of the clubs and a fan of directions gives the
+whole ring, with no polygon operations. All layers (clubs, areas and
+divisions) are written to one file in one pass. GeoJSON is written
+with the json module, with each feature's layer in its properties;
+geopandas is only imported to write a GeoPackage, which keeps the
+layers separate.
+"""
+import json
+import os
+import numpy as np
+
+# Buffers around the hulls in degrees, as in the postprocessing scripts
+AREA_BUFFER = 0.02
+DIVISION_BUFFER = 0.03
+
+def buffered_hull(points, radius, segments=64):
+    """
+    Outlines the convex hull of points grown by a radius.
+    :param points: An (m, 2) coordinate array.
+    :param radius: The buffer distance.
+    :param segments: The points of the ring (64 matches the default
+                     resolution of a shapely buffer).
+    :returns: A closed (segments + 1, 2) ring, first point repeated last.
+    """
+    points = np.asarray(points, dtype='float64')
+    angles = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    directions = np.column_stack([np.cos(angles), np.sin(angles)])
+    furthest = points[np.argmax(points @ directions.T, axis=0)]
+    ring = furthest + radius * directions
+    return np.vstack([ring, ring[:1]])
+
+def group_boundaries(coordinates, labels, radius):
+    """
+    Outlines every group of points.
+    :param coordinates: An (n, 2) long/lat array.
+    :param labels: The group label of every point.
+    :param radius: The buffer distance.
+    :returns: A dictionary of label to closed ring.
+    """
+    labels = np.asarray(labels)
+    order = np.argsort(labels, kind='stable')
+    groups, starts = np.unique(labels[order], return_index=True)
+    members = np.split(np.asarray(coordinates)[order], starts[1:])
+    return {group: buffered_hull(points, radius)
+            for group, points in zip(groups.tolist(), members)}
+
+def district_layers(clubs, area_buffer=AREA_BUFFER,
+                    division_buffer=DIVISION_BUFFER):
+    """
+    Builds the GIS layers of an alignment as GeoJSON-style features.
+    :param clubs: A data frame with lat, long and area and/or division.
+    :param area_buffer: The buffer around the area hulls.
+    :param division_buffer: The buffer around the division hulls.
+    :returns: A dictionary of layer name to a list of features.
+    """
+    coordinates = clubs[['long', 'lat']].to_numpy(dtype='float64')
+    records = json.loads(clubs.to_json(orient='records'))
+    layers = {'clubs': [{'type': 'Feature',
+                         'properties': record,
+                         'geometry': {'type': 'Point',
+                                      'coordinates': point}}
+                        for record, point in zip(records,
+                                                 coordinates.tolist())]}
+    for column, layer, buffer in [('area', 'areas', area_buffer),
+                                  ('division', 'divisions', division_buffer)]:
+        if column not in clubs.columns:
+            continue
+        boundaries = group_boundaries(coordinates, clubs[column], buffer)
+        layers[layer] = [{'type': 'Feature',
+                          'properties': {column: label},
+                          'geometry': {'type': 'LineString',
+                                       'coordinates': ring.tolist()}}
+                         for label, ring in boundaries.items()]
+    return layers
+
+def write_geojson(path, layers):
+    """
+    Writes the layers as one GeoJSON feature collection. Every
+    feature gets a "layer" property naming its layer.
+    :param path: The .geojson path.
+    :param layers: The dictionary from district_layers.
+    """
+    features = [dict(feature, properties=dict(feature['properties'],
+                                              layer=layer))
+                for layer, layer_features in layers.items()
+                for feature in layer_features]
+    with open(path, 'w') as f:
+        json.dump({'type': 'FeatureCollection', 'features': features}, f)
+
+def write_geopackage(path, layers):
+    """
+    Writes every layer to its own table of one GeoPackage.
+    :param path: The .gpkg path.
+    :param layers: The dictionary from district_layers.
+    """
+    # Imported here so nothing else needs the GIS stack
+    import geopandas as gpd
+    from shapely.geometry import shape
+    if os.path.exists(path):
+        os.remove(path)
+    for layer, features in layers.items():
+        frame = gpd.GeoDataFrame([feature['properties'] for feature in features],
+                                 geometry=[shape(feature['geometry'])
+                                           for feature in features],
+                                 crs='EPSG:4326')
+        frame.to_file(path, layer=layer, driver='GPKG')
+
+def write_layers(path, layers):
+    """
+    Writes the layers in the format the file extension names.
+    :param path: A .geojson (or .json) or .gpkg path.
+    :param layers: The dictionary from district_layers.
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.geojson', '.json'):
+        write_geojson(path, layers)
+    elif extension == '.gpkg':
+        write_geopackage(path, layers)
+    else:
+        raise ValueError(f'Unknown GIS format {extension}. '
+                         'Use .geojson or .gpkg.')
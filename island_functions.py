@@ -0,0 +1,171 @@
+"""
+These functions run the realignment genetic algorithm as an island
+model. K sub-populations evolve in separate processes. Every M
+generations each island sends copies of its best individuals to
+another island, which replace that island's worst individuals.
+With the ring topology island i always sends to island i + 1; with
+the random topology the destinations are a fresh random derangement
+each migration that every island derives from the shared seed, so
+each island always receives exactly one batch. At the end the hall
+of fame of every island is merged into one.
+"""
+import multiprocessing
+import queue
+import random
+import numpy as np
+from deap import tools
+from ga_loop_functions import ea_simple_batched
+from logging_functions import FitnessStatistics
+
+TOPOLOGIES = ('ring', 'random')
+
+def migration_targets(islands, topology, epoch, seed):
+    """
+    Gets the island each island sends its emigrants to.
+    :param islands: The number of islands.
+    :param topology: 'ring' or 'random'.
+    :param epoch: The migration number, so random targets change.
+    :param seed: The shared base seed.
+    :returns: A list where item i is the destination of island i.
+    """
+    if topology == 'ring':
+        return [(i + 1) % islands for i in range(islands)]
+    rng = random.Random(f'{seed}-{epoch}')
+    while True:
+        targets = rng.sample(range(islands), islands)
+        if all(target != i for i, target in enumerate(targets)):
+            return targets
+
+def island_worker(index, setup, setup_args, options, inboxes, results):
+    """
+    Evolves one island and exchanges migrants with the others.
+    :param index: The island number.
+    :param setup: A picklable function returning (problem, toolbox).
+    :param setup_args: The arguments for setup.
+    :param options: The dictionary built by run_islands.
+    :param inboxes: One queue per island for incoming migrants.
+    :param results: The queue the final hall of fame is sent to.
+    """
+    seed = options['seed']
+    if seed is not None:
+        random.seed(seed + index)
+        np.random.seed(seed + index)
+
+    _, toolbox = setup(*setup_args)
+    population = toolbox.population_creator(n=options['population_size'])
+    hof = tools.HallOfFame(options['hof_size'])
+    stats = FitnessStatistics()
+
+    logbook = tools.Logbook()
+    interval = options['migration_interval']
+    generations = options['generations']
+    done = 0
+    epoch = 0
+    while done < generations:
+        block = min(interval, generations - done)
+        population, block_log = ea_simple_batched(
+                                    population, toolbox,
+                                    cxpb=options['cxpb'],
+                                    mutpb=options['mutpb'],
+                                    ngen=block,
+                                    stats=stats,
+                                    halloffame=hof,
+                                    verbose=False,
+                                    gen_offset=done,
+                                    **options['loop_options'])
+        # Skip each block's starting record after the first block
+        for record in block_log[(1 if done else 0):]:
+            logbook.record(**record)
+        done += block
+
+        if done < generations and options['islands'] > 1:
+            targets = migration_targets(options['islands'],
+                                        options['topology'], epoch, seed)
+            emigrants = [toolbox.clone(ind) for ind in
+                         tools.selBest(population, options['migrants'])]
+            inboxes[targets[index]].put(emigrants)
+            immigrants = inboxes[index].get()
+            worst = sorted(range(len(population)),
+                           key=lambda i: population[i].fitness)
+            for position, new in zip(worst, immigrants):
+                population[position] = new
+            epoch += 1
+
+    results.put((index, list(hof), logbook))
+
+def merge_logbooks(logbooks):
+    """
+    Combines island logbooks into one: the minimum of the island
+    minimums and the mean of the island averages for each generation.
+    :param logbooks: A list of logbooks with gen, nevals, min and avg.
+    :returns: The merged logbook.
+    """
+    merged = tools.Logbook()
+    merged.header = ['gen', 'nevals', 'min', 'avg']
+    for records in zip(*logbooks):
+        merged.record(gen=records[0]['gen'],
+                      nevals=sum(r['nevals'] for r in records),
+                      min=np.min([r['min'] for r in records], axis=0),
+                      avg=np.mean([r['avg'] for r in records], axis=0))
+    return merged
+
+def run_islands(setup, setup_args, islands, generations, population_size,
+                cxpb, mutpb, hof_size, migration_interval=100, migrants=5,
+                topology='ring', seed=None, loop_options=None):
+    """
+    Runs the island model and merges the results.
+    :param setup: A picklable function returning (problem, toolbox).
+    :param setup_args: The arguments for setup.
+    :param islands: The number of islands (processes).
+    :param generations: The number of generations per island.
+    :param population_size: The population size of each island.
+    :param cxpb: The probability of mating two individuals.
+    :param mutpb: The probability of mutating an individual.
+    :param hof_size: The size of the merged hall of fame.
+    :param migration_interval: Generations between migrations.
+    :param migrants: The number of individuals each island sends.
+    :param topology: 'ring' or 'random'.
+    :param seed: An optional base seed. Island i uses seed + i.
+    :param loop_options: Extra keyword arguments for ea_simple_batched.
+    :returns: The merged hall of fame and the merged logbook.
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f'Unknown topology {topology}. Use one of {TOPOLOGIES}.')
+    options = {'islands': islands,
+               'generations': generations,
+               'population_size': population_size,
+               'cxpb': cxpb,
+               'mutpb': mutpb,
+               'hof_size': hof_size,
+               'migration_interval': migration_interval,
+               'migrants': migrants,
+               'topology': topology,
+               'seed': seed,
+               'loop_options': loop_options or {}}
+    inboxes = [multiprocessing.Queue() for _ in range(islands)]
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(
+                    target=island_worker,
+                    args=(i, setup, setup_args, options, inboxes, results))
+                 for i in range(islands)]
+    for process in processes:
+        process.start()
+
+    # Collect before joining so full queues cannot block the islands
+    finished = []
+    while len(finished) < islands:
+        try:
+            finished.append(results.get(timeout=1))
+        except queue.Empty:
+            if any(p.exitcode not in (None, 0) for p in processes):
+                for process in processes:
+                    process.terminate()
+                raise RuntimeError('An island process failed.')
+    finished.sort(key=lambda result: result[0])
+    for process in processes:
+        process.join()
+
+    hof = tools.HallOfFame(hof_size)
+    for _, items, _ in finished:
+        hof.update(items)
+    return hof, merge_logbooks([logbook for _, _, logbook in finished])
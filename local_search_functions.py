@@ -0,0 +1,136 @@
+"""
+These functions polish a single district ordering with local search.
+Two moves are used until neither improves the score:
+- inter-group swaps: exchange a club in one area with one of its
+  nearest neighbors in another area. Only the two legs touching each
+  swapped slot change, so every candidate's delta is O(1) and all of
+  them are scored in one NumPy gather. The best improving swap is
+  applied each step.
+- in-group reorders: put the members of every area in the order of
+  their shortest closed cycle, for all areas at once.
+Because every group is reordered to its shortest cycle before each
+swap, an improving swap also improves the order-free tour objective.
+The same functions work for divisions made of areas.
+"""
+import numpy as np
+from evaluation_functions import cycle_distances, best_tours
+
+# Improvements smaller than this are treated as float noise
+TOLERANCE = 1e-12
+
+def cycle_neighbors(layout, size):
+    """
+    Precomputes, for every permutation position, the positions of the
+    previous and next member in its group's cycle and the group number.
+    :param layout: The layout from group_layout.
+    :param size: The number of positions in the permutation.
+    :returns: A (previous, following, group) tuple of index arrays.
+    """
+    previous = np.empty(size, dtype=np.intp)
+    following = np.empty(size, dtype=np.intp)
+    group = np.empty(size, dtype=np.intp)
+    for columns, positions in layout:
+        previous[positions] = np.roll(positions, 1, axis=1)
+        following[positions] = np.roll(positions, -1, axis=1)
+        group[positions] = columns[:, None]
+    return previous, following, group
+
+def best_group_swap(ordering, distances, cycle, neighbors=None):
+    """
+    Finds the swap of two clubs in different groups that shortens the
+    total cycle distance the most.
+    :param ordering: The 1-D index array of the permutation.
+    :param distances: The square distance matrix.
+    :param cycle: The tuple from cycle_neighbors.
+    :param neighbors: An optional (n, k) nearest neighbor table that
+                      limits the candidates. All pairs are tried if None.
+    :returns: A (position, position, delta) tuple or None.
+    """
+    previous, following, group = cycle
+    clubs = ordering
+    before = clubs[previous]
+    after = clubs[following]
+
+    # Deltas are summed in float64 so a swap and its reverse cancel
+    def leg(a, b):
+        return distances[a, b].astype(np.float64, copy=False)
+
+    current = leg(before, clubs) + leg(clubs, after)
+
+    if neighbors is None:
+        candidates = np.broadcast_to(np.arange(len(clubs)),
+                                     (len(clubs), len(clubs)))
+    else:
+        location = np.empty_like(ordering)
+        location[ordering] = np.arange(len(ordering))
+        candidates = location[neighbors[clubs]]
+
+    # Change at slot i when it receives club j and at slot j with club i
+    incoming = clubs[candidates]
+    gain_i = leg(before[:, None], incoming) + \
+             leg(incoming, after[:, None]) - current[:, None]
+    gain_j = leg(before[candidates], clubs[:, None]) + \
+             leg(clubs[:, None], after[candidates]) - \
+             current[candidates]
+    delta = gain_i + gain_j
+    delta[group[candidates] == group[:, None]] = np.inf
+
+    best = np.argmin(delta)
+    i, column = np.unravel_index(best, delta.shape)
+    if delta[i, column] >= -TOLERANCE:
+        return None
+    return i, candidates[i, column], delta[i, column]
+
+def reorder_groups(ordering, distances, layout):
+    """
+    Puts every group's members in the order of their shortest cycle.
+    :param ordering: The 1-D index array of the permutation, updated
+                     in place.
+    :param distances: The square distance matrix.
+    :param layout: The layout from group_layout.
+    :returns: The number of groups that were reordered.
+    """
+    reordered = 0
+    for _, positions in layout:
+        members = ordering[positions]
+        tours = best_tours(members, distances)
+        improved = np.flatnonzero(cycle_distances(tours, distances) <
+                                  cycle_distances(members, distances) -
+                                  TOLERANCE)
+        ordering[positions[improved]] = tours[improved]
+        reordered += len(improved)
+    return reordered
+
+def improve_ordering(individual, distances, layout, neighbors=None,
+                     max_moves=100):
+    """
+    Runs best-improvement local search on an individual in place.
+    :param individual: The individual (any mutable sequence of indices).
+    :param distances: The square distance matrix.
+    :param layout: The layout from group_layout.
+    :param neighbors: An optional nearest neighbor table.
+    :param max_moves: The maximum number of inter-group swaps.
+    :returns: The number of moves applied.
+    """
+    original = np.asarray(individual, dtype=np.intp)
+    ordering = original.copy()
+    cycle = cycle_neighbors(layout, len(ordering))
+    moves = 0
+    swaps = 0
+    while True:
+        reordered = reorder_groups(ordering, distances, layout)
+        moves += reordered
+        swap = None
+        if swaps < max_moves:
+            swap = best_group_swap(ordering, distances, cycle, neighbors)
+        if swap is not None:
+            i, j, _ = swap
+            ordering[[i, j]] = ordering[[j, i]]
+            swaps += 1
+            moves += 1
+        elif not reordered:
+            break
+
+    for position in np.flatnonzero(ordering != original):
+        individual[position] = int(ordering[position])
+    return moves
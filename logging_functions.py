@@ -0,0 +1,158 @@
+"""
+These functions record the progress of a realignment run without
+printing a logbook row every generation. FitnessStatistics computes
+the min, average and standard deviation of a population's scores in
+one NumPy pass. GenerationLogger keeps a buffer of sampled generation
+records (min, avg, std, evaluations, elapsed time and the best score
+so far), writes it to a JSON Lines file in blocks, or to a Parquet file
+at the end if pandas has a Parquet engine, and prints a compact
+progress line every so many generations. The files can be read back
+with load_generation_log to compare and plot runs.
+"""
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+
+class FitnessStatistics:
+    '''This class is a drop-in for the tools.Statistics object the
+    loops use for a single objective. compile returns plain floats.
+    '''
+
+    fields = ['min', 'avg', 'std']
+
+    def compile(self, population):
+        """
+        Summarizes the first fitness value of every individual.
+        :param population: A list of evaluated individuals.
+        :returns: A dictionary of min, avg and std.
+        """
+        values = np.fromiter((ind.fitness.values[0] for ind in population),
+                             dtype=np.float64, count=len(population))
+        return {'min': float(values.min()),
+                'avg': float(values.mean()),
+                'std': float(values.std())}
+
+class GenerationLogger:
+    '''This class holds the buffered generation records of one run.
+    Only every `every`-th generation (and the first and last) is kept,
+    the buffer is written out every `buffer_size` records and a progress
+    line is printed every `progress_every` generations (0 = never).
+    '''
+
+    def __init__(self, path=None, every=1, progress_every=100,
+                 buffer_size=1000, append=False):
+        self.path = path
+        self.every = max(1, every)
+        self.progress_every = progress_every
+        self.buffer_size = buffer_size
+        self.append = append
+        self.parquet = path is not None and path.endswith('.parquet')
+        self.buffer = []
+        self.rows = []
+        self.best = None
+        self.evaluations = 0
+        self.start_time = None
+        self.started = False
+
+    def start(self):
+        """
+        Starts the clock and truncates the log file unless appending.
+        """
+        self.start_time = time.perf_counter()
+        if self.path is not None and not self.parquet and not self.append:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            open(self.path, 'w').close()
+        self.started = True
+
+    def resume_from(self, logbook):
+        """
+        Continues the evaluation count and best score of a checkpointed
+        run, appending to its log file.
+        :param logbook: The logbook from the checkpoint.
+        """
+        self.append = True
+        self.evaluations = sum(logbook.select('nevals'))
+        self.best = float(np.min(logbook.select('min')))
+
+    def record(self, gen, nevals, record, last=False):
+        """
+        Adds one generation.
+        :param gen: The generation number.
+        :param nevals: The evaluations made this generation.
+        :param record: The statistics dictionary with at least min.
+        :param last: Whether this is the final generation of the run.
+        """
+        if not self.started:
+            self.start()
+        self.evaluations += nevals
+        best = float(np.min(record['min']))
+        if self.best is None or best < self.best:
+            self.best = best
+        elapsed = time.perf_counter() - self.start_time
+
+        if gen % self.every == 0 or last:
+            row = {'gen': gen, 'nevals': nevals,
+                   'evaluations': self.evaluations,
+                   'elapsed': round(elapsed, 4), 'best': self.best}
+            row.update((k, float(np.min(v))) for k, v in record.items())
+            if self.parquet:
+                self.rows.append(row)
+            elif self.path is not None:
+                self.buffer.append(json.dumps(row))
+                if len(self.buffer) >= self.buffer_size:
+                    self.flush()
+
+        if self.progress_every and (gen % self.progress_every == 0 or last):
+            rate = self.evaluations / elapsed if elapsed > 0 else 0.0
+            print(f'gen {gen:>6}  best {self.best:.6f}  '
+                  f'min {float(np.min(record["min"])):.6f}  '
+                  f'avg {float(np.min(record["avg"])):.6f}  '
+                  f'{rate:,.0f} evals/s  {elapsed:.1f}s', flush=True)
+
+    def flush(self):
+        """
+        Appends the buffered JSON lines to the log file.
+        """
+        if self.buffer:
+            with open(self.path, 'a') as f:
+                f.write('\n'.join(self.buffer) + '\n')
+            self.buffer = []
+
+    def close(self):
+        """
+        Writes everything still buffered. A Parquet log falls back to
+        JSON Lines next to it if no Parquet engine is installed.
+        """
+        if self.parquet and self.rows:
+            log = pd.DataFrame(self.rows)
+            try:
+                if self.append and os.path.exists(self.path):
+                    log = pd.concat([pd.read_parquet(self.path), log])
+                log.to_parquet(self.path, index=False)
+            except ImportError:
+                self.path = f'{os.path.splitext(self.path)[0]}.jsonl'
+                print(f'No Parquet engine installed. Writing {self.path}.')
+                self.parquet = False
+                self.buffer = [json.dumps(row) for row in self.rows]
+                if not self.append:
+                    open(self.path, 'w').close()
+            self.rows = []
+        if self.path is not None:
+            self.flush()
+
+def load_generation_log(path):
+    """
+    Reads a generation log written by GenerationLogger.
+    :param path: A .jsonl or .parquet file.
+    :returns: A data frame with one row per logged generation.
+    """
+    if path.endswith('.parquet'):
+        log = pd.read_parquet(path)
+    else:
+        log = pd.read_json(path, lines=True)
+    # A resumed run repeats the generations after its checkpoint
+    return log.drop_duplicates('gen', keep='last').reset_index(drop=True)
@@ -0,0 +1,174 @@
+"""
+These functions solve large districts in three levels instead of one
+genetic algorithm over every club:
+1. coarsen: split the clubs into division-sized regions with
+   capacitated k-means, each region getting a run of consecutive
+   group slots of the district layout and exactly as many clubs as
+   those slots hold.
+2. solve: optimize the areas of every region as an independent small
+   district, in parallel processes.
+3. refine: run the local search over the whole district with only
+   cross-region neighbors as swap candidates, so clubs along region
+   edges can still move to the better area next door.
+The grouping functions put all fives first and at most four fours at
+the end, so a run of slots has the same group sizes, in the same
+order, as the grouping function picks for a district of that many
+clubs. Each region's best ordering can therefore be copied straight
+into its slots.
+"""
+import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from deap import tools
+
+from evaluation_functions import group_sizes, batch_average_distance
+from grouping_functions import select_grouping_function
+from local_search_functions import improve_ordering
+from distance_functions import nearest_neighbors
+from ga_loop_functions import ea_simple_batched, EarlyStopping
+from logging_functions import FitnessStatistics
+from seeding_functions import capacitated_kmeans
+
+def region_slots(sizes, region_groups):
+    """
+    Splits the group slots into consecutive runs, one per region.
+    :param sizes: The group sizes in layout order.
+    :param region_groups: The number of groups of each region.
+    :returns: A list of slot index arrays.
+    """
+    return np.split(np.arange(len(sizes)), np.cumsum(region_groups)[:-1])
+
+def partition_regions(locations, sizes, region_groups, rng=np.random):
+    """
+    Coarsens the clubs into compact regions that exactly fill their
+    slots.
+    :param locations: An (n, 2) coordinate array.
+    :param sizes: The group sizes in layout order.
+    :param region_groups: The number of groups of each region.
+    :param rng: The random generator.
+    :returns: The region label of every club and the slots of every
+              region.
+    """
+    slots = region_slots(sizes, region_groups)
+    capacities = [sizes[region].sum() for region in slots]
+    labels = capacitated_kmeans(locations, capacities, rng=rng)
+    return labels, slots
+
+def solve_region(setup, setup_args, locations, options, seed=None):
+    """
+    Optimizes the areas of one region as a district of its own.
+    :param setup: A picklable function returning (problem, toolbox)
+                  whose last argument is the in-memory locations.
+    :param setup_args: The other arguments for setup.
+    :param locations: The (m, 2) coordinates of the region's clubs.
+    :param options: A dictionary with engine, restarts, neighbors,
+                    generations, patience, population_size, cxpb,
+                    mutpb, local_search_every and local_search_elites.
+    :param seed: The random seed of this region.
+    :returns: The best ordering of region indices and its score.
+    """
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    problem, toolbox = setup(*setup_args, locations)
+    if options['engine'] == 'kmeans':
+        results = problem.constructive_orderings(options['restarts'],
+                                                 options['neighbors'])
+        ordering, score = min(results, key=lambda result: result[1])
+        return ordering.tolist(), score
+
+    population = toolbox.population_creator(n=options['population_size'])
+    hof = tools.HallOfFame(1)
+    ea_simple_batched(population, toolbox,
+                      cxpb=options['cxpb'],
+                      mutpb=options['mutpb'],
+                      ngen=options['generations'],
+                      stats=FitnessStatistics(),
+                      halloffame=hof,
+                      verbose=False,
+                      stopping=EarlyStopping(patience=options['patience']),
+                      local_search_every=options['local_search_every'],
+                      local_search_elites=options['local_search_elites'])
+    return list(hof[0]), hof[0].fitness.values[0]
+
+def assemble_ordering(labels, slots, sizes, region_orderings):
+    """
+    Writes every region's ordering into its slots.
+    :param labels: The region label of every club.
+    :param slots: The slot index arrays from partition_regions.
+    :param sizes: The group sizes in layout order.
+    :param region_orderings: One ordering of region indices per region.
+    :returns: The district ordering as an index array.
+    """
+    starts = np.concatenate(([0], np.cumsum(sizes)))
+    ordering = np.empty(len(labels), dtype=np.intp)
+    for region, (region_slots, local) in enumerate(zip(slots,
+                                                       region_orderings)):
+        members = np.flatnonzero(labels == region)
+        expected = group_sizes(select_grouping_function(len(members)),
+                               len(members))
+        if not np.array_equal(expected, sizes[region_slots]):
+            raise ValueError(f'Region {region} groups {expected} do not '
+                             f'match its slots {sizes[region_slots]}.')
+        ordering[starts[region_slots[0]]:starts[region_slots[-1] + 1]] = \
+            members[np.asarray(local, dtype=np.intp)]
+    return ordering
+
+def boundary_neighbors(neighbors, labels):
+    """
+    Keeps only the neighbors in another region. The others are
+    replaced by the club itself, which is never a valid swap.
+    :param neighbors: An (n, k) nearest neighbor table.
+    :param labels: The region label of every club.
+    :returns: An (n, k) neighbor table.
+    """
+    cross = labels[neighbors] != labels[:, None]
+    return np.where(cross, neighbors, np.arange(len(labels))[:, None])
+
+def multilevel_ordering(setup, setup_args, locations, distances, sizes,
+                        layout, region_groups, options, workers=0,
+                        seed=None, k=10, max_moves=None, objective='sequence',
+                        rng=np.random):
+    """
+    Coarsens, solves the regions and refines the region boundaries.
+    :param setup: A picklable function returning (problem, toolbox).
+    :param setup_args: The arguments for setup before the locations.
+    :param locations: An (n, 2) coordinate array.
+    :param distances: The square distance matrix.
+    :param sizes: The group sizes in layout order.
+    :param layout: The layout from group_layout.
+    :param region_groups: The number of groups of each region.
+    :param options: The solver options for solve_region.
+    :param workers: Solve this many regions at once (0 or 1 = serial).
+    :param seed: The base random seed; region i uses seed + i.
+    :param k: The nearest neighbors considered across boundaries.
+    :param max_moves: The maximum boundary swaps (default one per club).
+    :param objective: 'sequence' or 'tour'.
+    :param rng: The random generator of the partition.
+    :returns: The refined ordering and a dictionary with the region
+              scores and the district score before and after refinement.
+    """
+    locations = np.asarray(locations, dtype='float64')
+    labels, slots = partition_regions(locations, sizes, region_groups, rng)
+    regions = [np.flatnonzero(labels == region) for region in range(len(slots))]
+    seeds = [None if seed is None else seed + i for i in range(len(regions))]
+    arguments = [(setup, setup_args, locations[members], options, region_seed)
+                 for members, region_seed in zip(regions, seeds)]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(solve_region, *zip(*arguments)))
+    else:
+        results = [solve_region(*argument) for argument in arguments]
+
+    ordering = assemble_ordering(labels, slots, sizes,
+                                 [local for local, _ in results])
+    assembled = batch_average_distance(ordering, distances, layout,
+                                       objective)[0]
+    if max_moves is None:
+        max_moves = len(ordering)
+    cross = boundary_neighbors(nearest_neighbors(distances, k), labels)
+    improve_ordering(ordering, distances, layout, cross, max_moves)
+    refined = batch_average_distance(ordering, distances, layout,
+                                     objective)[0]
+    return ordering, {'region_scores': [score for _, score in results],
+                      'assembled': assembled, 'refined': refined}
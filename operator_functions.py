@@ -0,0 +1,101 @@
+"""
+These functions are spatially aware variation operators for the
+realignment genetic algorithm. They only move clubs between nearby
+groups, using the k-nearest-neighbor table of the distance matrix:
+- neighbor swap mutation: a club joins the group of one of its k
+  nearest neighbors, trading places with another member of it.
+- neighbor region crossover: a random club and its k nearest
+  neighbors are placed in each child at the positions they hold in
+  the other parent, by swaps, so a compact patch of one parent's
+  grouping is copied into the other.
+Both keep the individual a permutation and work on areas made of
+clubs as well as divisions made of areas.
+"""
+import random
+import numpy as np
+
+OPERATORS = ('shuffle', 'neighbor')
+
+def position_groups(layout, size):
+    """
+    Gets the group number of every permutation position.
+    :param layout: The layout from group_layout.
+    :param size: The number of positions in the permutation.
+    :returns: A 1-D index array.
+    """
+    groups = np.empty(size, dtype=np.intp)
+    for columns, positions in layout:
+        groups[positions] = columns[:, None]
+    return groups
+
+def locate(individual):
+    """
+    Inverts a permutation.
+    :param individual: The individual (any sequence of indices).
+    :returns: An array whose item c is the position of club c.
+    """
+    location = np.empty(len(individual), dtype=np.intp)
+    location[np.asarray(individual, dtype=np.intp)] = np.arange(len(individual))
+    return location
+
+def mut_neighbor_swap(individual, neighbors, groups, indpb):
+    """
+    Moves each club, with probability indpb, into the group of a random
+    one of its nearest neighbors that is in another group. The club
+    swaps places with a random other member of that group, since
+    trading places with the neighbor itself would barely change either
+    group.
+    :param individual: The individual, changed in place.
+    :param neighbors: The (n, k) table from nearest_neighbors.
+    :param groups: The position groups from position_groups.
+    :param indpb: The probability of moving each club.
+    :returns: A tuple of one individual.
+    """
+    location = locate(individual)
+    for i in range(len(individual)):
+        if random.random() < indpb:
+            club = individual[i]
+            candidates = [other for other in neighbors[club]
+                          if groups[location[other]] != groups[i]]
+            if candidates:
+                near = location[random.choice(candidates)]
+                members = np.flatnonzero(groups == groups[near])
+                j = random.choice([m for m in members if m != near])
+                other = individual[j]
+                individual[i], individual[j] = other, club
+                location[club], location[other] = j, i
+    return individual,
+
+def transplant(individual, donor, clubs):
+    """
+    Moves clubs to the positions they hold in a donor by swaps. A club
+    that is already placed is never displaced by a later swap.
+    :param individual: The individual, changed in place.
+    :param donor: The individual whose positions are copied.
+    :param clubs: The clubs to move.
+    """
+    location = locate(individual)
+    donor_location = locate(donor)
+    for club in clubs:
+        target = donor_location[club]
+        current = location[club]
+        if current != target:
+            displaced = individual[target]
+            individual[target], individual[current] = club, displaced
+            location[club], location[displaced] = target, current
+
+def cx_neighbor_region(ind1, ind2, neighbors):
+    """
+    Exchanges the placement of a random club and its nearest neighbors
+    between two individuals.
+    :param ind1: The first individual, changed in place.
+    :param ind2: The second individual, changed in place.
+    :param neighbors: The (n, k) table from nearest_neighbors.
+    :returns: A tuple of two individuals.
+    """
+    center = random.randrange(len(ind1))
+    region = [center] + list(neighbors[center])
+    parent1 = ind1[:]
+    transplant(ind1, ind2, region)
+    transplant(ind2, parent1, region)
+    return ind1, ind2
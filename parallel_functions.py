@@ -0,0 +1,139 @@
+"""
+These functions spread the batched fitness evaluation across a
+process pool. The distance matrix is written once to a memory-mapped
+.npy file (or the distance cache file is used as is) that every
+worker attaches to when it starts, so tasks only
+carry the chunk of individuals to score and never a pickled copy of
+the matrix. Each worker seeds its own random generators from a base
+seed plus its worker number so runs stay reproducible.
+"""
+import os
+import random
+import tempfile
+import multiprocessing
+import numpy as np
+from evaluation_functions import batch_average_distance
+
+# Worker state set by init_worker
+_distances = None
+_layout = None
+_objective = None
+
+def init_worker(distances_path, layout, objective, seed, counter):
+    """
+    Pool initializer that attaches a worker to the shared distances.
+    :param distances_path: The memory-mapped .npy distance file.
+    :param layout: The group layout from group_layout.
+    :param objective: 'sequence' or 'tour'.
+    :param seed: The base seed, or None to leave the generators alone.
+    :param counter: A shared counter used to number the workers.
+    """
+    global _distances, _layout, _objective
+    _distances = np.load(distances_path, mmap_mode='r')
+    _layout = layout
+    _objective = objective
+    with counter.get_lock():
+        counter.value += 1
+        worker = counter.value
+    if seed is not None:
+        random.seed(seed + worker)
+        np.random.seed(seed + worker)
+
+def whole_file(distances):
+    """
+    Checks whether an array is a memmap of a whole .npy file, which the
+    workers can map themselves. A slice or transpose of the map keeps
+    its filename and offset, so the header of the file is compared too.
+    :param distances: The distance matrix.
+    :returns: The file path, or None if the array must be copied.
+    """
+    if not (isinstance(distances, np.memmap) and distances.filename):
+        return None
+    try:
+        with open(distances.filename, 'rb') as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                header = np.lib.format.read_array_header_1_0(f)
+            else:
+                header = np.lib.format.read_array_header_2_0(f)
+            header_size = f.tell()
+    except (OSError, ValueError):
+        return None
+    shape, fortran_order, dtype = header
+    if distances.offset != header_size or distances.shape != shape or \
+            distances.dtype != dtype or fortran_order or \
+            not distances.flags['C_CONTIGUOUS']:
+        return None
+    return distances.filename
+
+def evaluate_chunk(chunk):
+    """
+    Scores one chunk of the population inside a worker.
+    :param chunk: A 2-D index array of individuals.
+    :returns: A 1-D array of mean distances.
+    """
+    return batch_average_distance(chunk, _distances, _layout, _objective)
+
+class ParallelEvaluator:
+    '''This class owns the process pool and the memory-mapped distance
+    file for a run. Its evaluate_population method can be registered
+    on the toolbox in place of the serial one. Use it as a context
+    manager so the pool is closed and the file removed afterwards.
+    '''
+
+    def __init__(self, distances, layout, workers, seed=None,
+                 objective='sequence'):
+        """
+        Creates the shared distance file and starts the workers.
+        :param distances: The square distance matrix, or a memmap of
+                          a whole .npy file that the workers can map
+                          directly.
+        :param layout: The group layout from group_layout.
+        :param workers: The number of worker processes.
+        :param seed: An optional base seed for the workers.
+        :param objective: 'sequence' or 'tour'.
+        """
+        self.workers = workers
+        # A memory-mapped cache file is shared as is; anything else,
+        # slices of one included, is written to a temporary file that
+        # close() removes
+        self.distances_path = whole_file(distances)
+        self.temporary = self.distances_path is None
+        if self.temporary:
+            handle, self.distances_path = tempfile.mkstemp(suffix='.npy')
+            with os.fdopen(handle, 'wb') as f:
+                np.save(f, np.ascontiguousarray(distances))
+        counter = multiprocessing.Value('i', 0)
+        self.pool = multiprocessing.Pool(
+                        workers, initializer=init_worker,
+                        initargs=(self.distances_path, layout, objective, seed,
+                                  counter))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Stops the workers and removes a temporary distance file.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        if self.temporary and os.path.exists(self.distances_path):
+            os.remove(self.distances_path)
+
+    def evaluate_population(self, population):
+        '''
+        Splits the population into one chunk per worker and scores the
+        chunks in parallel.
+        :param population: A list of individuals.
+        :return: A list of fitness tuples in population order.
+        '''
+        population = np.asarray(population, dtype=np.intp)
+        chunks = np.array_split(population, min(self.workers, len(population)))
+        scores = np.concatenate(self.pool.map(evaluate_chunk, chunks))
+        return [(score,) for score in scores]
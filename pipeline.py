@@ -0,0 +1,167 @@
+'''
+This script runs the whole realignment in one process: geocoding,
+area realignment, area assignment, area centroids, division
+realignment and the final district table. Stages whose inputs and
+options have not changed since the last run are skipped and their
+stored results reused.
+
+Example running:
+python pipeline.py clubs_raw.csv --engine kmeans
+python pipeline.py club_zips.csv --geocoded --until area_clubs
+python pipeline.py clubs_raw.csv --gis data/district.gpkg
+python pipeline.py club_zips.csv --geocoded --area-clubs edited.csv
+'''
+import argparse
+import copy
+import random
+import numpy as np
+import pandas as pd
+
+import area_realign
+import division_realign
+from pipeline_functions import Pipeline
+from postprocessing_functions import clubs_with_areas, area_centroids, \
+                                     district_alignment
+from gis_functions import district_layers, write_layers
+
+STAGES = ('clubs', 'areas', 'area_clubs', 'centroids', 'divisions',
+          'district')
+
+# Options that change a realignment result. Workers, caches and
+# checkpoints only change how fast it is found.
+RESULT_OPTIONS = ('engine', 'restarts', 'seed', 'metric', 'objective',
+                  'operators', 'neighbors', 'seeding', 'generations',
+                  'patience', 'min_improvement', 'window', 'time_budget',
+                  'local_search_every', 'local_search_elites', 'islands',
+                  'migration_interval', 'migrants', 'topology', 'multilevel')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+                description='Run the district realignment stages.')
+    parser.add_argument('clubs',
+                        help='club csv with "Club" and "Clubzip" columns, or '
+                             'a geocoded csv with --geocoded')
+    parser.add_argument('--geocoded', action='store_true',
+                        help='the club csv already has club_no, lat and long')
+    parser.add_argument('--area-clubs', default=None,
+                        help='a manually edited area_clubs.csv to use instead '
+                             'of the area realignment')
+    parser.add_argument('--until', choices=STAGES, default='district',
+                        help='last stage to bring up to date')
+    parser.add_argument('--force', nargs='*', choices=STAGES, default=[],
+                        help='stages to run even if they are up to date')
+    parser.add_argument('--directory', default='data/pipeline',
+                        help='where stage results are stored')
+    parser.add_argument('--output', default='data/new_district_alignment.csv',
+                        help='the final district csv')
+    parser.add_argument('--gis', default=None,
+                        help='also write the clubs and boundaries to this '
+                             '.geojson or .gpkg file')
+    parser.add_argument('--division-generations', type=int,
+                        default=division_realign.MAX_GENERATIONS,
+                        help='maximum generations of the division stage')
+    area_realign.add_arguments(parser)
+    return parser.parse_args(argv)
+
+def load_clubs(path, geocoded, seed):
+    '''
+    Reads the clubs, geocoding their zip codes unless already done.
+    :returns: A data frame with club_no, lat and long.
+    '''
+    if geocoded:
+        return pd.read_csv(path)
+    # Imported here so geocoded runs never need the zipcodes package
+    import district_preprocessing
+    if seed is not None:
+        np.random.seed(seed)
+    return district_preprocessing.geocode_dataframe(
+                district_preprocessing.import_club_zips(path))
+
+def realign(module, locations, args):
+    '''
+    Runs one realignment stage on in-memory locations.
+    :param module: area_realign or division_realign.
+    :param locations: The (n, 2) long/lat array.
+    :param args: The parsed options.
+    :returns: The best ordering as a list of indices.
+    '''
+    if args.seed is not None:
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+    problem, toolbox = module.create_problem(args.metric, args.cache_size,
+                                             args.objective, args.operators,
+                                             args.neighbors, args.seeding,
+                                             locations)
+    hof, _, reason = module.solve(args, problem, toolbox, locations)
+    best = hof.items[0]
+    print(f'Best distance score is {best.fitness.values[0]} ({reason}).')
+    return list(best)
+
+def build_pipeline(args):
+    '''
+    Registers the stages for the parsed options.
+    :returns: The Pipeline.
+    '''
+    division_args = copy.copy(args)
+    division_args.generations = args.division_generations
+    area_options = {option: getattr(args, option) for option in RESULT_OPTIONS}
+    division_options = {option: getattr(division_args, option)
+                        for option in RESULT_OPTIONS}
+
+    pipeline = Pipeline(args.directory)
+    pipeline.add('clubs',
+                 lambda: load_clubs(args.clubs, args.geocoded, args.seed),
+                 params={'geocoded': args.geocoded, 'seed': args.seed},
+                 sources=[args.clubs])
+    pipeline.add('areas',
+                 lambda clubs: realign(area_realign,
+                                       clubs[['long', 'lat']].to_numpy(),
+                                       args),
+                 inputs=['clubs'], params=area_options)
+    if args.area_clubs is None:
+        pipeline.add('area_clubs', clubs_with_areas,
+                     inputs=['clubs', 'areas'])
+    else:
+        pipeline.add('area_clubs', lambda: pd.read_csv(args.area_clubs),
+                     sources=[args.area_clubs])
+    pipeline.add('centroids', area_centroids, inputs=['area_clubs'])
+    pipeline.add('divisions',
+                 lambda centroids: realign(division_realign,
+                                           centroids[['long', 'lat']].to_numpy(),
+                                           division_args),
+                 inputs=['centroids'], params=division_options)
+    pipeline.add('district', district_alignment,
+                 inputs=['area_clubs', 'centroids', 'divisions'])
+    return pipeline
+
+def run_pipeline(args):
+    '''
+    Brings the stages up to date and exports the tables.
+    :param args: The parsed options.
+    :returns: The Pipeline and the status of every stage run.
+    '''
+    pipeline = build_pipeline(args)
+    targets = STAGES[:STAGES.index(args.until) + 1]
+    status = pipeline.run([args.until], force=args.force)
+
+    # Export the tables people inspect by hand
+    if 'area_clubs' in targets and args.area_clubs is None:
+        pipeline.result('area_clubs').to_csv('data/area_clubs.csv',
+                                             index=False)
+        print('area_clubs.csv created.')
+    if 'district' in targets:
+        pipeline.result('district').to_csv(args.output, index=False)
+        print(f'{args.output} created.')
+    if args.gis is not None:
+        layers_of = 'district' if 'district' in targets else 'area_clubs'
+        if layers_of in targets:
+            write_layers(args.gis, district_layers(pipeline.result(layers_of)))
+            print(f'{args.gis} created.')
+    print(f'Stages: {status}')
+    return pipeline, status
+
+def main():
+    run_pipeline(parse_args())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+These functions run the realignment workflow as a graph of stages in
+one process. Every stage has a key: a hash of its name, its parameters,
+the content of its source files and the keys of the stages it reads.
+A stage whose key matches the one recorded in the manifest is skipped
+and its stored result is only loaded if a stage that has to run needs
+it. Results of stages that do run are handed to the next stages in
+memory and stored for the next run.
+"""
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+from distance_functions import file_hash
+from checkpoint_functions import atomic_pickle
+
+class Pipeline:
+    '''This class holds the stages of a workflow in dependency order,
+    the directory their results are stored in and the manifest of the
+    keys those results were made with.
+    '''
+
+    def __init__(self, directory='data/pipeline'):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, 'manifest.json')
+        self.stages = OrderedDict()
+        self.results = {}
+
+    def add(self, name, function, inputs=(), params=None, sources=()):
+        """
+        Registers a stage. Stages must be added after their inputs.
+        :param name: The stage name.
+        :param function: Called with the input results as positional
+                         arguments, in the order of inputs.
+        :param inputs: The names of the stages this one reads.
+        :param params: A JSON-serializable dictionary of parameters.
+        :param sources: Paths of files the stage reads directly.
+        """
+        for stage in inputs:
+            if stage not in self.stages:
+                raise ValueError(f'Stage {name} reads unknown stage {stage}.')
+        self.stages[name] = {'function': function,
+                             'inputs': tuple(inputs),
+                             'params': params or {},
+                             'sources': tuple(sources)}
+
+    def keys(self):
+        """
+        Calculates the key of every stage from its definition and the
+        keys of its inputs.
+        :returns: A dictionary of stage name to hex key.
+        """
+        keys = {}
+        for name, stage in self.stages.items():
+            definition = {'name': name,
+                          'params': stage['params'],
+                          'sources': [file_hash(path)
+                                      for path in stage['sources']],
+                          'inputs': [keys[i] for i in stage['inputs']]}
+            text = json.dumps(definition, sort_keys=True, default=str)
+            keys[name] = hashlib.sha256(text.encode()).hexdigest()
+        return keys
+
+    def load_manifest(self):
+        """
+        Reads the keys the stored results were made with.
+        :returns: A dictionary of stage name to key.
+        """
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def result_path(self, name):
+        return os.path.join(self.directory, f'{name}.pkl')
+
+    def result(self, name):
+        """
+        Gets a stage result from memory or from its stored file.
+        :param name: The stage name.
+        :returns: The result.
+        """
+        if name not in self.results:
+            with open(self.result_path(name), 'rb') as f:
+                self.results[name] = pickle.load(f)
+        return self.results[name]
+
+    def required(self, targets):
+        """
+        Lists the target stages and everything they read.
+        :param targets: Stage names.
+        :returns: A set of stage names.
+        """
+        needed = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise ValueError(f'Unknown stage {name}.')
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.stages[name]['inputs'])
+        return needed
+
+    def run(self, targets=None, force=()):
+        """
+        Runs the stages that are out of date.
+        :param targets: The stages to bring up to date (default all).
+        :param force: Stages to run even if they are up to date.
+        :returns: A dictionary of stage name to 'ran' or 'skipped'.
+        """
+        needed = self.required(targets or list(self.stages))
+        keys = self.keys()
+        manifest = self.load_manifest()
+        status = {}
+        for name, stage in self.stages.items():
+            if name not in needed:
+                continue
+            current = manifest.get(name) == keys[name] and \
+                      os.path.exists(self.result_path(name))
+            if current and name not in force and \
+                    all(status[i] == 'skipped' for i in stage['inputs']):
+                status[name] = 'skipped'
+                print(f'Stage {name} is up to date.')
+                continue
+            print(f'Running stage {name}.')
+            arguments = [self.result(i) for i in stage['inputs']]
+            self.results[name] = stage['function'](*arguments)
+            atomic_pickle(self.results[name], self.result_path(name))
+            manifest[name] = keys[name]
+            # Write after every stage so an interrupted run keeps its progress
+            self.save_manifest(manifest)
+            status[name] = 'ran'
+        return status
+
+    def save_manifest(self, manifest):
+        temp_path = f'{self.manifest_path}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
@@ -0,0 +1,44 @@
+"""
+These functions draw the convergence chart of a realignment run.
+Matplotlib and seaborn are only imported when a chart is actually
+drawn, so worker processes, tests and headless batch runs never load
+them. A chart can be shown on screen, written to a file (the format
+follows the extension, such as .png or .svg) or skipped.
+"""
+
+PLOT_SHOW = 'show'
+PLOT_NONE = 'none'
+
+def plot_convergence(logbook, plot=PLOT_SHOW):
+    """
+    Plots the minimum and average fitness of every generation.
+    :param logbook: A logbook with 'min' and 'avg' columns.
+    :param plot: 'show', 'none' or the path of the image to write.
+    :returns: The path written, or None.
+    """
+    if plot == PLOT_NONE:
+        return None
+    import matplotlib
+    if plot != PLOT_SHOW:
+        # Render off screen so no display is needed
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    min_val, avg_val = logbook.select('min', 'avg')
+
+    plt.figure(1)
+    sns.set_style("whitegrid")
+    plt.plot(min_val, color='red')
+    plt.plot(avg_val, color='green')
+    plt.xlabel('Generation')
+    plt.ylabel('Min / Average Fitness')
+    plt.title('Min and Average fitness over Generations')
+
+    if plot == PLOT_SHOW:
+        plt.show()
+        return None
+    plt.savefig(plot, bbox_inches='tight')
+    plt.close()
+    print(f'Convergence chart written to {plot}.')
+    return plot
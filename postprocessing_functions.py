@@ -0,0 +1,69 @@
+"""
+These functions turn the best orderings of the two genetic algorithm
+stages into club, area and division tables. They do the same work as
+the postprocessing scripts, as functions over data frames, so the
+pipeline can pass the results from stage to stage in memory.
+"""
+import numpy as np
+import pandas as pd
+from assignment_functions import assignment_labels
+
+def group_labels(ordering):
+    """
+    Labels every index of an ordering with its group number, in index
+    order (the label of index i is item i).
+    :param ordering: The best permutation of indices.
+    :returns: An integer array of group numbers starting at 1.
+    """
+    labels = np.empty(len(ordering), dtype=int)
+    labels[np.asarray(ordering)] = assignment_labels(len(ordering))
+    return labels
+
+def clubs_with_areas(clubs, ordering):
+    """
+    Adds the area of every club.
+    :param clubs: A data frame with club_no, lat and long in the order
+                  the area genetic algorithm indexed them.
+    :param ordering: The best area ordering of club indices.
+    :returns: A data frame of club_no, lat, long and area sorted by area.
+    """
+    area_clubs = clubs[['club_no', 'lat', 'long']].reset_index(drop=True)
+    area_clubs['area'] = group_labels(ordering)
+    return area_clubs.sort_values(['area', 'club_no']).reset_index(drop=True)
+
+def area_centroids(area_clubs):
+    """
+    Calculates the mean location of every area.
+    :param area_clubs: The data frame from clubs_with_areas.
+    :returns: A data frame of lat and long indexed by area.
+    """
+    return area_clubs.groupby('area')[['lat', 'long']].mean()
+
+def remap_areas(df):
+    """
+    Renumbers the areas so each area number is its division number
+    times ten plus its rank in the division (from 0, in order of the
+    old area numbers).
+    :param df: A data frame with club_no, area, division, lat and long.
+    :returns: The renumbered data frame.
+    """
+    rank = df.groupby('division')['area'].rank(method='dense').astype(int)
+    remapped = df.assign(area=df['division'] * 10 + rank - 1)
+    return remapped[['club_no', 'area', 'division', 'lat', 'long']] \
+                   .reset_index(drop=True)
+
+def district_alignment(area_clubs, centroids, ordering):
+    """
+    Adds the divisions to the clubs and renumbers the areas.
+    :param area_clubs: The data frame from clubs_with_areas.
+    :param centroids: The data frame from area_centroids, in the order
+                      the division genetic algorithm indexed the areas.
+    :param ordering: The best division ordering of area indices.
+    :returns: A data frame of club_no, area, division, lat and long.
+    """
+    divisions = pd.DataFrame({'area': centroids.index,
+                              'division': group_labels(ordering)})
+    clubs = area_clubs.merge(divisions, on='area') \
+                      .sort_values(['division', 'area', 'club_no']) \
+                      .reset_index(drop=True)
+    return remap_areas(clubs)
@@ -0,0 +1,133 @@
+"""
+These functions measure where the time of a realignment run goes.
+PhaseProfiler wraps the toolbox operators (select, mate, mutate, clone,
+evaluate_population and local_search) so every call adds its wall time
+and call count to its phase, and the generational loop times the
+hall of fame updates, statistics and checkpoints the same way. Each
+wrapper costs two perf_counter calls, so the profiler can stay on in
+long runs. The totals are printed as a summary at the end of the run
+and, per generation, can be added to the logbook as t_<phase> fields.
+Behind a fitness cache only the individuals actually evaluated (the
+cache misses) count as evaluations.
+"""
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Toolbox functions wrapped by instrument, in summary order
+TOOLBOX_PHASES = ('select', 'clone', 'mate', 'mutate',
+                  'evaluate_population', 'local_search')
+
+class PhaseProfiler:
+    '''This class holds the cumulative time and call count of every
+    phase, the number of individuals evaluated and the totals at the
+    last lap, so per generation times can be taken as differences.
+    '''
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.evaluations = 0
+        self.last_lap = {}
+        self.start_time = time.perf_counter()
+
+    def timed(self, phase, function, cache=None):
+        """
+        Wraps a function so its calls are added to a phase.
+        :param phase: The phase name.
+        :param function: The function to time.
+        :param cache: The FitnessCache in front of evaluate_population,
+                      if any, so only its misses count as evaluations.
+        :returns: The wrapped function.
+        """
+        counts_evaluations = phase == 'evaluate_population'
+
+        def wrapper(*args, **kwargs):
+            evaluated = cache.evaluated if cache is not None else 0
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.seconds[phase] += time.perf_counter() - start
+                self.calls[phase] += 1
+                if counts_evaluations:
+                    self.evaluations += cache.evaluated - evaluated \
+                                        if cache is not None else len(args[0])
+        return wrapper
+
+    def instrument(self, toolbox, cache=None):
+        """
+        Replaces the registered toolbox operators with timed ones.
+        Call it after the last operator is registered.
+        :param toolbox: A DEAP toolbox.
+        :param cache: The FitnessCache wrapped around evaluate_population,
+                      if any.
+        """
+        for phase in TOOLBOX_PHASES:
+            if hasattr(toolbox, phase):
+                setattr(toolbox, phase, self.timed(phase,
+                                                   getattr(toolbox, phase),
+                                                   cache))
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Times the body of a with statement as one call of a phase.
+        :param name: The phase name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+            self.calls[name] += 1
+
+    def lap(self):
+        """
+        Gets the time spent in every phase since the last lap.
+        :returns: A dictionary of t_<phase> to seconds.
+        """
+        times = {f't_{name}': seconds - self.last_lap.get(name, 0.0)
+                 for name, seconds in self.seconds.items()}
+        self.last_lap = dict(self.seconds)
+        return times
+
+    def summary(self):
+        """
+        Summarizes the run so far.
+        :returns: A dictionary with the elapsed seconds, evaluations per
+                  second of evaluation time and, for every phase, its
+                  seconds, calls and share of the elapsed time.
+        """
+        elapsed = time.perf_counter() - self.start_time
+        evaluating = self.seconds.get('evaluate_population', 0.0)
+        phases = {name: {'seconds': seconds,
+                         'calls': self.calls[name],
+                         'share': seconds / elapsed if elapsed > 0 else 0.0}
+                  for name, seconds in self.seconds.items()}
+        return {'elapsed': elapsed,
+                'evaluations': self.evaluations,
+                'evals_per_second': self.evaluations / evaluating
+                                    if evaluating > 0 else 0.0,
+                'phases': phases}
+
+    def format_summary(self):
+        """
+        Formats the summary as a table, slowest phase first.
+        :returns: A multi-line string.
+        """
+        summary = self.summary()
+        lines = [f'{"phase":<20}{"seconds":>10}{"calls":>10}{"share":>8}']
+        accounted = 0.0
+        for name, phase in sorted(summary['phases'].items(),
+                                  key=lambda item: -item[1]['seconds']):
+            accounted += phase['seconds']
+            lines.append(f'{name:<20}{phase["seconds"]:>10.3f}'
+                         f'{phase["calls"]:>10}{phase["share"]:>8.1%}')
+        other = summary['elapsed'] - accounted
+        lines.append(f'{"other":<20}{other:>10.3f}{"":>10}'
+                     f'{other / max(summary["elapsed"], 1e-12):>8.1%}')
+        lines.append(f'{summary["evaluations"]} evaluations at '
+                     f'{summary["evals_per_second"]:,.0f} per second of '
+                     f'evaluation time in {summary["elapsed"]:.2f} seconds.')
+        return '\n'.join(lines)
@@ -0,0 +1,484 @@
+"""
+These functions run a realignment genetic algorithm for either level
+of the district: clubs into areas (area_realign.py) or areas into
+divisions (division_realign.py). Both levels share the toolbox, the
+command line options and every engine (the generational loop with
+parallel evaluation, checkpoints, logging and profiling, the k-means
+constructive engine, the island model and, for areas, the multilevel
+mode). What differs between them is held by a Realignment: the
+problem class, the generation cap, the checkpoint and best index
+paths and whether the multilevel mode is offered. The two scripts
+only build their Realignment and hand it to these functions.
+"""
+from deap import base
+from deap import creator
+from deap import tools
+
+import argparse
+import random
+import array
+import numpy as np
+import os
+import time
+import pickle
+from functools import partial
+
+from ga_loop_functions import ea_simple_batched, EarlyStopping
+from parallel_functions import ParallelEvaluator
+from distance_functions import METRICS
+from evaluation_functions import OBJECTIVES, group_sizes
+from checkpoint_functions import Checkpointer, load_checkpoint
+from island_functions import run_islands, TOPOLOGIES
+from cache_functions import FitnessCache, cached_evaluation
+from operator_functions import OPERATORS
+from seeding_functions import init_seeded_population
+from constructive_functions import ENGINES
+from plot_functions import plot_convergence, PLOT_SHOW
+from logging_functions import FitnessStatistics, GenerationLogger
+from profiling_functions import PhaseProfiler
+from multilevel_functions import multilevel_ordering
+from grouping_functions import select_grouping_function
+
+# Genetic Algorithm constants:
+POPULATION_SIZE = 100
+P_CROSSOVER = 0.9  # Probability for crossover
+P_MUTATION = 0.15   # Probability for mutating an individual
+HALL_OF_FAME_SIZE = 10
+REGION_PATIENCE = 500  # Region stall limit when --patience is not set
+
+""" Set fitness strategy - minimize the average group distance.
+The types are only created once so the module can be imported
+again (by worker processes or tests) without DEAP warnings.
+"""
+if not hasattr(creator, 'MinFit'):
+    creator.create("MinFit", base.Fitness, weights=(-1.0, ))
+
+# Create the Individual type based on a list of integers
+if not hasattr(creator, 'Individual'):
+    creator.create('Individual', array.array, typecode='i',
+                    fitness=creator.MinFit)
+
+class Realignment:
+    '''This class holds what differs between the area and the division
+    realignment, so one set of runner functions serves both scripts.
+    '''
+
+    def __init__(self, problem_class, layout, description, max_generations,
+                 checkpoint_path, best_path, multilevel=False):
+        """
+        :param problem_class: DistrictRealignment or AreaAlignment.
+        :param layout: The name of the problem's group layout attribute.
+        :param description: The command line description.
+        :param max_generations: The default generation cap.
+        :param checkpoint_path: Where checkpoints are written.
+        :param best_path: Where the best ordering is exported.
+        :param multilevel: Whether --multilevel is offered.
+        """
+        self.problem_class = problem_class
+        self.layout = layout
+        self.description = description
+        self.max_generations = max_generations
+        self.checkpoint_path = checkpoint_path
+        self.best_path = best_path
+        self.multilevel = multilevel
+
+def create_toolbox(problem, operators='shuffle', neighbors=10, seeding=0.0):
+    '''
+    Registers the tools and genetic operators for a problem.
+    :param problem: The DistrictRealignment or AreaAlignment instance.
+    :param operators: 'shuffle' for random swaps anywhere or 'neighbor'
+                      for swaps between nearby groups only.
+    :param neighbors: The number of nearest neighbors the neighbor
+                      operators consider.
+    :param seeding: The share of the initial population built from
+                    geographic orderings instead of at random.
+    :returns: The toolbox.
+    '''
+    toolbox = base.Toolbox()
+
+    # A tool to create the shuffled indices
+    toolbox.register('random_ordering', random.sample,
+                        range(len(problem)), len(problem))
+
+    # A tool that creates individuals (an alignment)
+    toolbox.register('individual_creator', tools.initIterate,
+                      creator.Individual, toolbox.random_ordering)
+
+    # A tool that creates a population (multiple alignments)
+    toolbox.register('population_creator', tools.initRepeat,
+                      list, toolbox.individual_creator)
+
+    # Optionally start part of the population from compact groups
+    if seeding:
+        toolbox.register('population_creator', init_seeded_population,
+                          creator.Individual, toolbox.individual_creator,
+                          problem.seed_orderings, fraction=seeding)
+
+    # Register evaluation functions (single and whole generation).
+    # Offspring only re-score the groups their variation changed.
+    toolbox.register('evaluate', problem.evaluate_district)
+    toolbox.register('evaluate_population',
+                      problem.evaluate_population_incremental)
+
+    # Skip partitions that were already scored
+    if problem.fitness_cache is not None:
+        use_fitness_cache(toolbox, problem)
+
+    # Memetic local search applied to the best offspring
+    toolbox.register('local_search', problem.local_search)
+
+    # Genetic operators:
+    toolbox.register("select", tools.selTournament, tournsize=2)
+    toolbox.register("mutate_shuffle", tools.mutShuffleIndexes,
+                      indpb=1.0/len(problem))
+    toolbox.register("mate_shuffle", tools.cxUniformPartialyMatched,
+                      indpb=2.0/len(problem))
+
+    # Spatial alternatives that only move members between nearby groups
+    toolbox.register("mutate_neighbor", problem.mutate_neighbors,
+                      indpb=1.0/len(problem), k=neighbors)
+    toolbox.register("mate_neighbor", problem.mate_neighbors, k=neighbors)
+
+    toolbox.register("mutate", getattr(toolbox, f'mutate_{operators}'))
+    toolbox.register("mate", getattr(toolbox, f'mate_{operators}'))
+    return toolbox
+
+def use_fitness_cache(toolbox, problem):
+    '''
+    Wraps the registered batch evaluation with the fitness cache.
+    '''
+    toolbox.register('evaluate_population',
+                      cached_evaluation(toolbox.evaluate_population,
+                                        problem.partition_keys,
+                                        problem.fitness_cache))
+
+def add_arguments(realignment, parser):
+    '''
+    Adds the run options to a parser. The pipeline reuses them.
+    :param realignment: The Realignment of the script.
+    :param parser: An argparse parser.
+    :returns: The parser.
+    '''
+    parser.add_argument('--engine', choices=ENGINES, default='ga',
+                        help='genetic algorithm (ga) or a fast capacitated '
+                             'k-means with local search (kmeans)')
+    parser.add_argument('--restarts', type=int, default=5,
+                        help='k-means starts used by --engine kmeans')
+    workers_help = 'evaluate across this many processes (0 = serial)'
+    if realignment.multilevel:
+        workers_help += '; with --multilevel, regions solved at once'
+    parser.add_argument('--workers', type=int, default=0, help=workers_help)
+    if realignment.multilevel:
+        parser.add_argument('--multilevel', action='store_true',
+                            help='solve the areas of division-sized regions '
+                                 'separately, then refine the region '
+                                 'boundaries')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='seed for reproducible runs')
+    parser.add_argument('--metric', choices=METRICS, default='euclidean',
+                        help='distance in degrees (euclidean) or km (haversine)')
+    parser.add_argument('--objective', choices=OBJECTIVES, default='sequence',
+                        help='score groups in listed order (sequence) or by '
+                             'their shortest cycle (tour)')
+    parser.add_argument('--operators', choices=OPERATORS, default='shuffle',
+                        help='swap anywhere (shuffle) or only between '
+                             'nearest neighbors (neighbor)')
+    parser.add_argument('--neighbors', type=int, default=10,
+                        help='nearest neighbors used by the neighbor '
+                             'operators')
+    parser.add_argument('--seeding', type=float, default=0.0,
+                        help='share of the initial population built from '
+                             'geographic orderings (0 = all random)')
+    parser.add_argument('--generations', type=int,
+                        default=realignment.max_generations,
+                        help='maximum number of generations')
+    parser.add_argument('--patience', type=int, default=None,
+                        help='stop after this many generations without a new best')
+    parser.add_argument('--min-improvement', type=float, default=None,
+                        help='stop when the best improves by less than this '
+                             'fraction over --window generations')
+    parser.add_argument('--window', type=int, default=1000,
+                        help='generations used by --min-improvement')
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help='stop after this many seconds')
+    parser.add_argument('--local-search-every', type=int, default=0,
+                        help='polish the best offspring every k generations '
+                             '(0 = off)')
+    parser.add_argument('--local-search-elites', type=int, default=1,
+                        help='number of best offspring to polish')
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help='cache this many partition fitnesses (0 = off)')
+    parser.add_argument('--islands', type=int, default=0,
+                        help='evolve this many populations in separate '
+                             'processes with migration (0 = one population)')
+    parser.add_argument('--migration-interval', type=int, default=100,
+                        help='generations between island migrations')
+    parser.add_argument('--migrants', type=int, default=5,
+                        help='individuals each island sends per migration')
+    parser.add_argument('--topology', choices=TOPOLOGIES, default='ring',
+                        help='where islands send their migrants')
+    parser.add_argument('--checkpoint-every', type=int, default=500,
+                        help='checkpoint every N generations (0 = off)')
+    parser.add_argument('--checkpoint-seconds', type=float, default=None,
+                        help='also checkpoint every T seconds')
+    parser.add_argument('--resume', action='store_true',
+                        help=f'continue from {realignment.checkpoint_path}')
+    parser.add_argument('--log', default=None,
+                        help='write sampled generation statistics to this '
+                             '.jsonl (or .parquet) file')
+    parser.add_argument('--log-every', type=int, default=1,
+                        help='log every N generations')
+    parser.add_argument('--progress-every', type=int, default=100,
+                        help='print a progress line every N generations '
+                             '(0 = off)')
+    parser.add_argument('--profile', action='store_true',
+                        help='time each phase of a generation, print a '
+                             'summary and add the times to the log')
+    parser.add_argument('--plot', default=PLOT_SHOW,
+                        help="'show' the convergence chart, write it to a "
+                             "file such as convergence.png or .svg, or "
+                             "'none' to skip it")
+    return parser
+
+def parse_args(realignment):
+    parser = argparse.ArgumentParser(description=realignment.description)
+    return add_arguments(realignment, parser).parse_args()
+
+def create_problem(realignment, metric, cache_size=0, objective='sequence',
+                   operators='shuffle', neighbors=10, seeding=0.0,
+                   locations=None, verbose=True):
+    '''
+    Builds the problem and its toolbox. Island processes call this
+    to set themselves up.
+    :param realignment: The Realignment of the script.
+    :param metric: The distance metric.
+    :param cache_size: The fitness cache size (0 = no cache).
+    :param objective: The group objective.
+    :param operators: The mutation and crossover family.
+    :param neighbors: The neighbor count for the neighbor operators.
+    :param seeding: The share of the initial population that is seeded.
+    :param locations: Optional in-memory coordinates instead of the files.
+    :param verbose: Print the problem's counts and grouping function.
+    :returns: The problem instance and its toolbox.
+    '''
+    problem = realignment.problem_class(metric=metric, objective=objective,
+                                        locations=locations, verbose=verbose)
+    if cache_size:
+        problem.fitness_cache = FitnessCache(cache_size)
+    return problem, create_toolbox(problem, operators, neighbors, seeding)
+
+def run_single(realignment, args, problem, toolbox):
+    '''
+    Evolves one population in this process, with optional parallel
+    evaluation, early stopping, checkpoints and resume.
+    :returns: The hall of fame, the logbook and the stopping reason.
+    '''
+    evaluator = None
+    if args.workers > 1:
+        evaluator = ParallelEvaluator(problem.distances,
+                                      getattr(problem, realignment.layout),
+                                      args.workers, seed=args.seed,
+                                      objective=problem.objective)
+        toolbox.register('evaluate_population', evaluator.evaluate_population)
+        if problem.fitness_cache is not None:
+            use_fitness_cache(toolbox, problem)
+
+    checkpoint = None
+    if args.resume:
+        if os.path.exists(realignment.checkpoint_path):
+            checkpoint = load_checkpoint(realignment.checkpoint_path)
+            print(f'Resuming after generation {checkpoint["generation"]}.')
+        else:
+            print('No checkpoint found. Starting a new run.')
+
+    population = [] if checkpoint else \
+                 toolbox.population_creator(n=POPULATION_SIZE)
+
+    profiler = None
+    if args.profile:
+        profiler = PhaseProfiler()
+        profiler.instrument(toolbox, problem.fitness_cache)
+
+    stats = FitnessStatistics()
+    logger = GenerationLogger(args.log, every=args.log_every,
+                              progress_every=args.progress_every,
+                              append=checkpoint is not None)
+
+    hof = tools.HallOfFame(HALL_OF_FAME_SIZE)
+
+    stopping = EarlyStopping(patience=args.patience,
+                             min_improvement=args.min_improvement,
+                             window=args.window,
+                             time_budget=args.time_budget)
+
+    # Checkpoints also export the best so far for postprocessing
+    checkpointer = Checkpointer(realignment.checkpoint_path,
+                                every=args.checkpoint_every,
+                                seconds=args.checkpoint_seconds,
+                                best_path=realignment.best_path)
+
+    try:
+        population, logbook = ea_simple_batched(
+                                    population, toolbox,
+                                    cxpb=P_CROSSOVER,
+                                    mutpb=P_MUTATION,
+                                    ngen=args.generations,
+                                    stats=stats,
+                                    halloffame=hof,
+                                    verbose=False,
+                                    stopping=stopping,
+                                    checkpointer=checkpointer,
+                                    checkpoint=checkpoint,
+                                    local_search_every=args.local_search_every,
+                                    local_search_elites=args.local_search_elites,
+                                    logger=logger,
+                                    profiler=profiler)
+    finally:
+        logger.close()
+        if profiler is not None:
+            print(profiler.format_summary())
+        if evaluator is not None:
+            evaluator.close()
+    return hof, logbook, stopping.reason
+
+def run_constructive(args, problem):
+    '''
+    Builds the groups with capacitated k-means and local search instead
+    of the genetic algorithm. Each restart is logged as a generation.
+    :returns: The hall of fame, the logbook and the stopping reason.
+    '''
+    hof = tools.HallOfFame(HALL_OF_FAME_SIZE)
+    logbook = tools.Logbook()
+    results = problem.constructive_orderings(args.restarts, args.neighbors)
+    for gen, (ordering, score) in enumerate(results):
+        individual = creator.Individual(ordering.tolist())
+        individual.fitness.values = (score,)
+        hof.update([individual])
+        logbook.record(gen=gen, nevals=1, min=np.array(hof[0].fitness.values),
+                       avg=np.array([score]))
+        print(f'Restart {gen}: {score}')
+    return hof, logbook, 'constructive'
+
+def run_island_model(realignment, args, locations=None):
+    '''
+    Evolves one population per island process with periodic migration.
+    Early stopping, checkpoints and --workers do not apply here.
+    :param locations: Optional in-memory coordinates for the islands.
+    :returns: The merged hall of fame, the logbook and the stopping reason.
+    '''
+    hof, logbook = run_islands(
+                        partial(create_problem, realignment),
+                        (args.metric, args.cache_size, args.objective,
+                         args.operators, args.neighbors, args.seeding,
+                         locations),
+                        islands=args.islands,
+                        generations=args.generations,
+                        population_size=POPULATION_SIZE,
+                        cxpb=P_CROSSOVER,
+                        mutpb=P_MUTATION,
+                        hof_size=HALL_OF_FAME_SIZE,
+                        migration_interval=args.migration_interval,
+                        migrants=args.migrants,
+                        topology=args.topology,
+                        seed=args.seed,
+                        loop_options={
+                            'local_search_every': args.local_search_every,
+                            'local_search_elites': args.local_search_elites})
+    return hof, logbook, 'max_generations'
+
+def run_multilevel(realignment, args, problem):
+    '''
+    Splits the members into regions the size of the next level's
+    groups, optimizes the groups of each region with the selected
+    engine and refines the region boundaries. The assembled and refined
+    scores are logged as generations 0 and 1.
+    :returns: The hall of fame, the logbook and the stopping reason.
+    '''
+    sizes = group_sizes(select_grouping_function(len(problem)), len(problem))
+    region_groups = group_sizes(select_grouping_function(len(sizes)),
+                                len(sizes))
+    options = {'engine': args.engine,
+               'restarts': args.restarts,
+               'neighbors': args.neighbors,
+               'generations': args.generations,
+               'patience': args.patience if args.patience is not None
+                           else REGION_PATIENCE,
+               'population_size': POPULATION_SIZE,
+               'cxpb': P_CROSSOVER,
+               'mutpb': P_MUTATION,
+               'local_search_every': args.local_search_every,
+               'local_search_elites': args.local_search_elites}
+    print(f'Solving {len(region_groups)} regions.')
+    # Region problems stay quiet so parallel regions do not flood the output
+    ordering, scores = multilevel_ordering(
+                            partial(create_problem, realignment,
+                                    verbose=False),
+                            (args.metric, 0, args.objective, args.operators,
+                             args.neighbors, args.seeding),
+                            problem.locations, problem.distances, sizes,
+                            getattr(problem, realignment.layout),
+                            region_groups, options, workers=args.workers,
+                            seed=args.seed, k=args.neighbors,
+                            objective=problem.objective)
+    print(f'Assembled score {scores["assembled"]}, '
+          f'refined score {scores["refined"]}.')
+
+    hof = tools.HallOfFame(HALL_OF_FAME_SIZE)
+    individual = creator.Individual(ordering.tolist())
+    individual.fitness.values = (scores['refined'],)
+    hof.update([individual])
+    logbook = tools.Logbook()
+    for gen, score in enumerate([scores['assembled'], scores['refined']]):
+        logbook.record(gen=gen, nevals=1, min=score, avg=score)
+    return hof, logbook, 'multilevel'
+
+def solve(realignment, args, problem, toolbox, locations=None):
+    '''
+    Runs the engine the arguments select. The pipeline passes the area
+    options to the division level too, so --multilevel only applies
+    where the Realignment offers it.
+    :param locations: The in-memory coordinates problem was built from,
+                      if any, so island processes can rebuild it.
+    :returns: The hall of fame, the logbook and the stopping reason.
+    '''
+    if realignment.multilevel and args.multilevel:
+        return run_multilevel(realignment, args, problem)
+    if args.engine == 'kmeans':
+        return run_constructive(args, problem)
+    if args.islands > 1:
+        return run_island_model(realignment, args, locations)
+    return run_single(realignment, args, problem, toolbox)
+
+# Genetic Algorithm flow:
+def main(realignment):
+    args = parse_args(realignment)
+    start_time = time.time()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+
+    # Loading here also builds the distance cache before any islands start
+    problem, toolbox = create_problem(realignment, args.metric,
+                                      args.cache_size, args.objective,
+                                      args.operators, args.neighbors,
+                                      args.seeding)
+
+    hof, logbook, reason = solve(realignment, args, problem, toolbox)
+
+    # Print metrics
+    execution_time = (time.time() - start_time)
+
+    best = hof.items[0]
+    print(f'Best district is {best}.')
+    print(f'Stopped after generation {logbook[-1]["gen"]} ({reason}).')
+    print(f'Execution time is {execution_time} seconds.')
+    print(f'Best distance score is {best.fitness.values[0]}')
+    if problem.fitness_cache is not None and args.islands <= 1:
+        print(f'Fitness cache: {problem.fitness_cache.stats()}')
+
+    # Plot stats
+    plot_convergence(logbook, args.plot)
+
+    with open(realignment.best_path, 'wb') as f:
+        pickle.dump(best, f)
@@ -0,0 +1,244 @@
+"""
+These functions build geographic orderings of the clubs to seed part
+of the initial population. The grouping functions cut a permutation
+into consecutive runs of five (and four) clubs, so any ordering that
+keeps nearby clubs next to each other already decodes into compact
+areas. Four constructive heuristics are used in turn:
+- hilbert / morton: sort the clubs along a space-filling curve over
+  their coordinates, randomly rotated and shifted for each seed.
+- sweep: sort the clubs by angle around the district centroid from a
+  random starting angle.
+- kmeans: capacity-constrained k-means with one cluster per group and
+  the exact group sizes of the layout, then written out cluster by
+  cluster in layout order.
+Within each group the members are put in angular order around the
+group's mean, which is a short cycle for areas of four or five.
+"""
+import numpy as np
+
+HEURISTICS = ('hilbert', 'morton', 'sweep', 'kmeans')
+
+# Bits per axis of the space-filling curve grid
+CURVE_ORDER = 16
+
+def grid_coordinates(locations, order=CURVE_ORDER, rng=np.random):
+    """
+    Randomly rotates and shifts the locations and maps them onto a
+    square integer grid, keeping the aspect ratio.
+    :param locations: An (n, 2) coordinate array.
+    :param order: Bits per axis.
+    :param rng: The random generator.
+    :returns: The x and y grid coordinates as integer arrays.
+    """
+    angle = rng.uniform(0, 2 * np.pi)
+    rotation = np.array([[np.cos(angle), -np.sin(angle)],
+                         [np.sin(angle), np.cos(angle)]])
+    points = np.asarray(locations, dtype='float64') @ rotation.T
+    points -= points.min(axis=0)
+    scale = max(points.max(), 1e-12)
+    # Shift by up to half the extent so curve seams land elsewhere
+    points = (points / scale + rng.uniform(0, 0.5, 2)) / 1.5
+    cells = (1 << order) - 1
+    grid = np.clip(np.round(points * cells), 0, cells).astype(np.int64)
+    return grid[:, 0], grid[:, 1]
+
+def hilbert_index(x, y, order=CURVE_ORDER):
+    """
+    Calculates the distance along a Hilbert curve for grid points.
+    :param x: An integer array of x grid coordinates.
+    :param y: An integer array of y grid coordinates.
+    :param order: Bits per axis.
+    :returns: An integer array of curve positions.
+    """
+    x = np.array(x, dtype=np.int64)
+    y = np.array(y, dtype=np.int64)
+    d = np.zeros(len(x), dtype=np.int64)
+    last = (1 << order) - 1
+    s = 1 << (order - 1)
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx) ^ ry)
+        # Rotate the quadrant so the curve stays continuous
+        flip = ~ry & rx
+        x[flip] = last - x[flip]
+        y[flip] = last - y[flip]
+        swap = ~ry
+        x[swap], y[swap] = y[swap], x[swap]
+        s >>= 1
+    return d
+
+def morton_index(x, y, order=CURVE_ORDER):
+    """
+    Calculates the Z-order (Morton) position of grid points by
+    interleaving the bits of the coordinates.
+    :param x: An integer array of x grid coordinates.
+    :param y: An integer array of y grid coordinates.
+    :param order: Bits per axis.
+    :returns: An integer array of curve positions.
+    """
+    x = np.asarray(x, dtype=np.int64)
+    y = np.asarray(y, dtype=np.int64)
+    d = np.zeros(len(x), dtype=np.int64)
+    for bit in range(order):
+        d |= ((x >> bit) & 1) << (2 * bit)
+        d |= ((y >> bit) & 1) << (2 * bit + 1)
+    return d
+
+def curve_ordering(locations, curve='hilbert', rng=np.random):
+    """
+    Orders the locations along a randomly placed space-filling curve.
+    :param locations: An (n, 2) coordinate array.
+    :param curve: 'hilbert' or 'morton'.
+    :param rng: The random generator.
+    :returns: A permutation index array.
+    """
+    x, y = grid_coordinates(locations, rng=rng)
+    index = hilbert_index(x, y) if curve == 'hilbert' else morton_index(x, y)
+    return np.argsort(index, kind='stable')
+
+def sweep_ordering(locations, rng=np.random):
+    """
+    Orders the locations by angle around their centroid, starting at
+    a random angle.
+    :param locations: An (n, 2) coordinate array.
+    :param rng: The random generator.
+    :returns: A permutation index array.
+    """
+    offsets = np.asarray(locations, dtype='float64') - \
+              np.mean(locations, axis=0)
+    angles = np.arctan2(offsets[:, 1], offsets[:, 0])
+    start = rng.uniform(-np.pi, np.pi)
+    return np.argsort((angles - start) % (2 * np.pi), kind='stable')
+
+def nearest_centers(locations, centers, m, block_size=1024):
+    """
+    Ranks the m nearest centers of every location.
+    :param locations: An (n, 2) coordinate array.
+    :param centers: A (k, 2) coordinate array.
+    :param m: The number of centers per location (capped at k).
+    :param block_size: The number of locations ranked at a time.
+    :returns: An (n, m) index array and the (n, m) squared distances,
+              nearest first.
+    """
+    m = min(m, len(centers))
+    nearest = np.empty((len(locations), m), dtype=np.intp)
+    distances = np.empty((len(locations), m))
+    for start in range(0, len(locations), block_size):
+        block = locations[start:start + block_size]
+        squared = ((block[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        candidates = np.argpartition(squared, m - 1, axis=1)[:, :m]
+        values = np.take_along_axis(squared, candidates, axis=1)
+        order = np.argsort(values, axis=1, kind='stable')
+        nearest[start:start + block_size] = \
+            np.take_along_axis(candidates, order, axis=1)
+        distances[start:start + block_size] = \
+            np.take_along_axis(values, order, axis=1)
+    return nearest, distances
+
+def capacitated_assignment(locations, centers, sizes, m=16):
+    """
+    Greedily assigns every location to a center so center c gets
+    exactly sizes[c] members. Locations closest to a center choose
+    first and take their nearest center with room left.
+    :param locations: An (n, 2) coordinate array.
+    :param centers: A (k, 2) coordinate array.
+    :param sizes: The k capacities, summing to n.
+    :param m: The number of nearest centers tried before all are.
+    :returns: An array of n center labels.
+    """
+    nearest, distances = nearest_centers(locations, centers, m)
+    remaining = np.array(sizes, dtype=np.intp)
+    labels = np.empty(len(locations), dtype=np.intp)
+    for point in np.argsort(distances[:, 0], kind='stable'):
+        open_centers = nearest[point][remaining[nearest[point]] > 0]
+        if len(open_centers):
+            center = open_centers[0]
+        else:
+            available = np.flatnonzero(remaining > 0)
+            squared = ((centers[available] - locations[point]) ** 2).sum(axis=1)
+            center = available[np.argmin(squared)]
+        labels[point] = center
+        remaining[center] -= 1
+    return labels
+
+def capacitated_kmeans(locations, sizes, iterations=10, rng=np.random):
+    """
+    Clusters the locations into groups of exactly the given sizes with
+    Lloyd iterations over capacitated assignments.
+    :param locations: An (n, 2) coordinate array.
+    :param sizes: The group sizes, summing to n.
+    :param iterations: The maximum number of iterations.
+    :param rng: The random generator for the starting centers.
+    :returns: An array of n group labels.
+    """
+    locations = np.asarray(locations, dtype='float64')
+    sizes = np.asarray(sizes)
+    k = len(sizes)
+    centers = locations[rng.choice(len(locations), k, replace=False)]
+    labels = None
+    for _ in range(iterations):
+        new_labels = capacitated_assignment(locations, centers, sizes)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for axis in range(2):
+            centers[:, axis] = np.bincount(labels, locations[:, axis],
+                                           minlength=k) / sizes
+    return labels
+
+def labels_to_ordering(labels, locations, sizes):
+    """
+    Writes groups into the permutation layout: group c fills the c-th
+    run of positions, members in angular order around its mean.
+    :param labels: The group label of every location.
+    :param locations: An (n, 2) coordinate array.
+    :param sizes: The group sizes in layout order.
+    :returns: A permutation index array.
+    """
+    ordering = np.argsort(labels, kind='stable')
+    for members in np.split(ordering, np.cumsum(sizes)[:-1]):
+        offsets = locations[members] - locations[members].mean(axis=0)
+        members[:] = members[np.argsort(np.arctan2(offsets[:, 1],
+                                                   offsets[:, 0]))]
+    return ordering
+
+def seed_orderings(locations, sizes, count, rng=np.random):
+    """
+    Builds geographic orderings, cycling through the heuristics.
+    :param locations: An (n, 2) coordinate array.
+    :param sizes: The group sizes in layout order from group_sizes.
+    :param count: The number of orderings.
+    :param rng: The random generator.
+    :returns: A list of permutation index arrays.
+    """
+    locations = np.asarray(locations, dtype='float64')
+    orderings = []
+    for i in range(count):
+        heuristic = HEURISTICS[i % len(HEURISTICS)]
+        if heuristic == 'kmeans':
+            labels = capacitated_kmeans(locations, sizes, rng=rng)
+        else:
+            if heuristic == 'sweep':
+                ordering = sweep_ordering(locations, rng)
+            else:
+                ordering = curve_ordering(locations, heuristic, rng)
+            labels = np.repeat(np.arange(len(sizes)), sizes)[np.argsort(ordering)]
+        orderings.append(labels_to_ordering(labels, locations, sizes))
+    return orderings
+
+def init_seeded_population(container, individual_creator, seed_function,
+                           n, fraction):
+    """
+    Creates a population with part of it built from seed orderings and
+    the rest random for diversity.
+    :param container: The individual type, such as creator.Individual.
+    :param individual_creator: Creates one random individual.
+    :param seed_function: Returns a given number of orderings.
+    :param n: The population size.
+    :param fraction: The share of the population that is seeded.
+    :returns: A list of individuals.
+    """
+    count = min(n, int(round(n * fraction)))
+    seeds = [container(ordering.tolist()) for ordering in seed_function(count)]
+    return seeds + [individual_creator() for _ in range(n - count)]
@@ -0,0 +1,19 @@
+import pytest
+import numpy as np
+
+import assignment_functions as af
+from grouping_functions import select_grouping_function
+
+# Test 1
+def test_labels_match_grouping_function():
+    for size in range(16, 300):
+        groups = select_grouping_function(size)(list(range(size)))
+        expected = [number for number, group in enumerate(groups, 1)
+                    for _ in group]
+        assert af.assignment_labels(size).tolist() == expected
+
+# Test 2
+def test_select_assignment_function_labels_a_list():
+    clubs = list(range(23))
+    labels = af.select_assignment_function(len(clubs))(clubs)
+    assert np.bincount(labels).tolist() == [0, 5, 5, 5, 4, 4]
@@ -0,0 +1,33 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+import batch_functions as bf
+
+# Create a dummy roster of two districts with a summary row
+roster = pd.DataFrame({'District': [50.0, 50.0, np.nan, 'F', 50.0],
+                       'Club': [7036, 5509, np.nan, 12, 9682],
+                       'Clubzip': ['75501', '75501', np.nan, '90210', None]})
+
+# Test 1
+def test_split_roster_keeps_complete_clubs_by_district():
+    clubs = bf.split_roster(roster)
+    assert list(clubs.district) == ['50', '50', 'F']
+    assert list(clubs.club_no) == [5509, 7036, 12]
+
+# Test 2
+def test_combine_alignments_adds_district_column():
+    alignment = pd.DataFrame({'club_no': [1], 'area': [10], 'division': [1]})
+    combined = bf.combine_alignments({'51': alignment, '50': alignment})
+    assert list(combined.columns) == ['district', 'club_no', 'area',
+                                      'division']
+    assert list(combined.district) == ['50', '51']
+
+# Test 3
+def test_district_summary_scores_areas():
+    rng = np.random.default_rng(5)
+    clubs = pd.DataFrame(rng.random((20, 2)), columns=['long', 'lat'])
+    summary = bf.district_summary(clubs, areas=list(range(20)))
+    assert summary['clubs'] == 20 and summary['areas'] == 4
+    assert summary['area_score'] > 0
+    assert 'divisions' not in summary
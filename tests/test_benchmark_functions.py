@@ -0,0 +1,39 @@
+import pytest
+import numpy as np
+
+import benchmark_functions as bf
+from ga_area_functions import DistrictRealignment
+
+# Test 1
+def test_synthetic_district_is_reproducible_and_bounded():
+    locations = bf.synthetic_district(500, seed=3)
+    (west, south), (east, north) = bf.BOUNDS
+    assert locations.shape == (500, 2) and locations.dtype == np.float32
+    assert np.array_equal(locations, bf.synthetic_district(500, seed=3))
+    assert not np.array_equal(locations, bf.synthetic_district(500, seed=4))
+    assert locations[:, 0].min() >= west and locations[:, 0].max() <= east
+    assert locations[:, 1].min() >= south and locations[:, 1].max() <= north
+
+# Test 2
+def test_benchmarks_measure_distances_and_evaluations():
+    locations = bf.synthetic_district(100)
+    result = bf.benchmark_distances(locations)
+    assert result['distance_matrix_mb'] == pytest.approx(100 * 100 * 4 / 2 ** 20)
+    rates = bf.benchmark_evaluation(DistrictRealignment(locations=locations),
+                                    seconds=0.01, population_size=5)
+    assert rates['evaluate_district_per_second'] > 0
+    assert rates['evaluate_population_per_second'] > 0
+
+# Test 3
+def test_compare_benchmarks_knows_which_way_is_better():
+    old = {'results': [{'size': 100, 'distance_seconds': 2.0,
+                        'evaluate_district_per_second': 100.0,
+                        'ga_best': 1.0}]}
+    new = {'results': [{'size': 100, 'distance_seconds': 1.0,
+                        'evaluate_district_per_second': 50.0,
+                        'ga_best': 1.01}]}
+    changes = {metric: change for _, metric, _, _, _, change in
+               bf.compare_benchmarks(old, new)}
+    assert changes == {'distance_seconds': 'better',
+                       'evaluate_district_per_second': 'worse',
+                       'ga_best': 'same'}
@@ -0,0 +1,79 @@
+import pytest
+import numpy as np
+import random
+
+import cache_functions as cf
+import evaluation_functions as ef
+from grouping_functions import select_grouping_function
+
+# Create a dummy district layout
+size = 23
+layout = ef.group_layout(select_grouping_function(size), size)
+
+def shuffle_areas(ordering):
+    # Reorder equal-size areas and rotate/reverse their members
+    ordering = list(ordering)
+    for _, positions in layout:
+        areas = [ordering[p[0]:p[-1] + 1] for p in positions]
+        random.shuffle(areas)
+        for p, area in zip(positions, areas):
+            shift = random.randrange(len(area))
+            area = area[shift:] + area[:shift]
+            if random.random() < 0.5:
+                area = area[::-1]
+            ordering[p[0]:p[-1] + 1] = area
+    return ordering
+
+# Test 1
+def test_equivalent_orderings_share_a_key():
+    ordering = random.sample(range(size), size)
+    keys = cf.partition_keys([ordering] + [shuffle_areas(ordering)
+                                           for _ in range(10)], layout)
+    assert len(set(keys)) == 1
+
+# Test 2
+def test_equivalent_orderings_score_the_same():
+    rng = np.random.default_rng(1)
+    distances = rng.random((size, size))
+    distances = distances + distances.T
+    ordering = random.sample(range(size), size)
+    scores = ef.batch_average_distance(
+                [ordering, shuffle_areas(ordering)], distances, layout)
+    assert np.isclose(scores[0], scores[1])
+
+# Test 3
+def test_different_cycle_order_changes_key():
+    ordering = list(range(size))
+    swapped = list(ordering)
+    swapped[0], swapped[2] = swapped[2], swapped[0]
+    swapped[3], swapped[2] = swapped[2], swapped[3]
+    keys = cf.partition_keys([ordering, swapped], layout)
+    assert keys[0] != keys[1]
+    assert len(set(cf.partition_keys([ordering, swapped], layout,
+                                     cyclic=False))) == 1
+
+# Test 4
+def test_lru_counters_and_eviction():
+    cache = cf.FitnessCache(maxsize=2)
+    cache.put(b'a', (1.0,))
+    cache.put(b'b', (2.0,))
+    assert cache.get(b'a') == (1.0,)
+    cache.put(b'c', (3.0,))
+    assert cache.get(b'b') is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['evictions'] == 1
+
+# Test 5
+def test_cached_evaluation_only_scores_misses():
+    calls = []
+    def evaluate(population):
+        calls.append(len(population))
+        return [(float(sum(ind[:5])),) for ind in population]
+    evaluate_cached = cf.cached_evaluation(
+                        evaluate, lambda pop: cf.partition_keys(pop, layout),
+                        cf.FitnessCache())
+    ordering = random.sample(range(size), size)
+    evaluate_cached([ordering, ordering])
+    evaluate_cached([ordering, random.sample(range(size), size)])
+    assert calls == [1, 1]
@@ -0,0 +1,66 @@
+import pytest
+import random
+import numpy as np
+from deap import tools
+
+import checkpoint_functions as cf
+import area_realign
+from ga_loop_functions import ea_simple_batched
+from logging_functions import FitnessStatistics
+
+# Create a dummy district
+locations = np.random.default_rng(40).random((40, 2))
+
+def run(ngen, checkpointer=None, checkpoint=None):
+    random.seed(7)
+    np.random.seed(7)
+    _, toolbox = area_realign.create_problem('euclidean', locations=locations)
+    population = toolbox.population_creator(n=20)
+    hof = tools.HallOfFame(1)
+    _, logbook = ea_simple_batched(population, toolbox, 0.9, 0.15, ngen,
+                                   stats=FitnessStatistics(), halloffame=hof,
+                                   verbose=False, checkpointer=checkpointer,
+                                   checkpoint=checkpoint)
+    return hof, logbook
+
+# Test 1
+def test_atomic_pickle_round_trip(tmpdir):
+    path = str(tmpdir.join('nested', 'checkpoint.pkl'))
+    cf.atomic_pickle({'generation': 3, 'values': [1, 2]}, path)
+    assert cf.load_checkpoint(path) == {'generation': 3, 'values': [1, 2]}
+    assert tmpdir.join('nested').listdir() == [tmpdir.join('nested',
+                                                           'checkpoint.pkl')]
+
+# Test 2
+def test_due_fires_on_the_interval():
+    checkpointer = cf.Checkpointer('unused.pkl', every=5)
+    assert [gen for gen in range(1, 16) if checkpointer.due(gen)] == [5, 10, 15]
+    assert not cf.Checkpointer('unused.pkl').due(5)
+
+# Test 3
+def test_save_exports_best_individual(tmpdir):
+    best_path = str(tmpdir.join('best.pkl'))
+    checkpointer = cf.Checkpointer(str(tmpdir.join('checkpoint.pkl')),
+                                   every=5, best_path=best_path)
+    hof, _ = run(5, checkpointer)
+    assert list(cf.load_checkpoint(best_path)) == list(hof[0])
+
+# Test 4
+def test_resumed_run_matches_uninterrupted_run(tmpdir):
+    path = str(tmpdir.join('checkpoint.pkl'))
+    hof, logbook = run(20)
+    run(10, cf.Checkpointer(path, every=10))
+    checkpoint = cf.load_checkpoint(path)
+    assert checkpoint['generation'] == 10
+    resumed_hof, resumed_logbook = run(20, checkpoint=checkpoint)
+    assert resumed_hof[0].fitness.values == hof[0].fitness.values
+    assert list(resumed_logbook) == list(logbook)
+
+# Test 5
+def test_no_checkpoint_when_intervals_are_off(tmpdir):
+    path = tmpdir.join('checkpoint.pkl')
+    best_path = tmpdir.join('best.pkl')
+    hof, _ = run(5, cf.Checkpointer(str(path), every=0,
+                                    best_path=str(best_path)))
+    assert not path.exists()
+    assert list(cf.load_checkpoint(str(best_path))) == list(hof[0])
@@ -0,0 +1,39 @@
+import pytest
+import numpy as np
+
+import constructive_functions as cf
+import seeding_functions as sf
+import evaluation_functions as ef
+from distance_functions import pairwise_distances, nearest_neighbors
+from grouping_functions import select_grouping_function
+
+# Create a dummy district
+size = 83
+rng = np.random.default_rng(83)
+locations = rng.random((size, 2))
+distances = pairwise_distances(locations)
+grouping = select_grouping_function(size)
+layout = ef.group_layout(grouping, size)
+sizes = ef.group_sizes(grouping, size)
+
+# Test 1
+def test_constructive_orderings_are_scored_permutations():
+    np.random.seed(1)
+    results = cf.constructive_orderings(locations, distances, layout, sizes,
+                                        restarts=3,
+                                        neighbors=nearest_neighbors(distances, 10))
+    assert len(results) == 3
+    for ordering, score in results:
+        assert sorted(ordering) == list(range(size))
+        assert score == ef.batch_average_distance(ordering, distances,
+                                                  layout)[0]
+
+# Test 2
+def test_local_search_improves_on_kmeans():
+    np.random.seed(2)
+    labels = sf.capacitated_kmeans(locations, sizes)
+    start = sf.labels_to_ordering(labels, locations, sizes)
+    np.random.seed(2)
+    (_, score), = cf.constructive_orderings(locations, distances, layout,
+                                            sizes, restarts=1)
+    assert score <= ef.batch_average_distance(start, distances, layout)[0]
@@ -0,0 +1,59 @@
+import pytest
+import numpy as np
+import os.path
+
+import distance_functions as df
+
+# Create dummy (long, lat) locations
+rng = np.random.default_rng(50)
+locations = np.column_stack([rng.uniform(-95, -93, 60),
+                             rng.uniform(32, 34, 60)]).astype('float32')
+
+# Test 1
+def test_euclidean_matches_pairwise_norm():
+    distances = df.pairwise_distances(locations, block_size=7)
+    for i in range(len(locations)):
+        for j in range(len(locations)):
+            assert distances[i][j] == np.linalg.norm(locations[j] - locations[i])
+
+# Test 2
+def test_haversine_is_symmetric_km():
+    distances = df.pairwise_distances(locations, 'haversine')
+    assert np.allclose(distances, distances.T)
+    # One degree of latitude is about 111 km
+    one_degree = df.pairwise_distances([[-94, 33], [-94, 34]], 'haversine')
+    assert 110 < one_degree[0][1] < 112
+
+# Test 3
+def test_unknown_metric_raises():
+    with pytest.raises(ValueError):
+        df.pairwise_distances(locations, 'manhattan')
+
+# Test 4
+def test_cache_hit_and_invalidation(tmp_path):
+    source = tmp_path / 'club_zips.csv'
+    source.write_text('club_no,zip,lat,long\n1,75501,33.4,-94.0\n')
+    paths = [str(tmp_path / name)
+             for name in ('locations.npy', 'distances.npy', 'distances.json')]
+    key = df.cache_key(str(source), 'euclidean')
+    assert df.load_cache(*paths, key) is None
+    df.save_cache(locations, df.pairwise_distances(locations), *paths, key)
+    assert df.load_cache(*paths, key) is not None
+    assert df.load_cache(*paths, df.cache_key(str(source), 'haversine')) is None
+    source.write_text('club_no,zip,lat,long\n1,75501,33.5,-94.0\n')
+    assert df.load_cache(*paths, df.cache_key(str(source), 'euclidean')) is None
+
+# Test 5
+def test_cache_is_memory_mapped_float32(tmp_path):
+    source = tmp_path / 'club_zips.csv'
+    source.write_text('club_no,zip,lat,long\n1,75501,33.4,-94.0\n')
+    paths = [str(tmp_path / name)
+             for name in ('locations.npy', 'distances.npy', 'distances.json')]
+    key = df.cache_key(str(source), 'euclidean')
+    distances = df.pairwise_distances(locations)
+    df.save_cache(locations, distances, *paths, key)
+    cached_locations, cached = df.load_cache(*paths, key)
+    assert isinstance(cached, np.memmap)
+    assert cached.dtype == np.float32
+    assert np.array_equal(cached, distances.astype(np.float32))
+    assert np.array_equal(cached_locations, locations)
@@ -95,4 +95,57 @@ def test_calculate_club_quality_data_type():
                     club_dcp_file='data/20210112_D50_Club_Performance.csv', 
                     member_award_file='data/20201229_D50_Awards.csv')
     club_data = dp.calculate_club_quality(clubs)
-    assert club_data['club_no'].dtype == int
\ No newline at end of file
+    assert club_data['club_no'].dtype == int
+# Test 14
+def test_normalize_zip_formats():
+    assert dp.normalize_zip(75501) == '75501'
+    assert dp.normalize_zip(1234.0) == '01234'
+    assert dp.normalize_zip(' 71101-4321 ') == '71101'
+
+# Test 15
+def test_resolve_zips_looks_up_each_missing_zip_once():
+    cache = {'75501': [33.4, -94.0]}
+    index = (np.array([71101], dtype=np.int32),
+             np.array([[32.5, -93.7]], dtype=np.float32))
+    unresolved = dp.resolve_zips(['75501', '71101', '71101', '00000'],
+                                 cache, index)
+    assert unresolved == ['00000']
+    assert cache['71101'] == [32.5, -93.7]
+
+# Test 16
+def test_geocode_reports_unresolved_and_persists_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    clubs = pd.DataFrame({'club_no': [1, 2, 3], 'zip': [75501, 75501, 99999]})
+    cache_path = str(tmp_path / 'zip_cache.json')
+    geocoded = dp.geocode_dataframe(clubs, cache_path,
+                                    index=(np.array([75501], dtype=np.int32),
+                                           np.array([[33.4, -94.0]],
+                                                    dtype=np.float32)))
+    assert list(geocoded.club_no) == [1, 2]
+    assert dp.load_zip_cache(cache_path) == {'75501': [33.4, -94.0]}
+
+# Test 17
+def test_lookup_zips_binary_search():
+    index = (np.array([1234, 71101, 75501], dtype=np.int32),
+             np.array([[42.1, -71.2], [32.5, -93.7], [33.4, -94.0]],
+                      dtype=np.float32))
+    coordinates, found = dp.lookup_zips(['75501', '01234', '99999', 'abcde'],
+                                        index)
+    assert list(found) == [True, True, False, False]
+    assert np.allclose(coordinates[:2], [[33.4, -94.0], [42.1, -71.2]])
+    assert np.isnan(coordinates[2:]).all()
+
+# Test 18
+def test_zip_index_loads_prebuilt_file(tmp_path):
+    path = str(tmp_path / 'zip_index.npz')
+    np.savez(path, zips=np.array([75501], dtype=np.int32),
+             coordinates=np.array([[33.4, -94.0]], dtype=np.float32))
+    zips, coordinates = dp.zip_index(path)
+    assert zips.dtype == np.int32 and coordinates.dtype == np.float32
+
+# Test 19
+def test_lookup_zips_empty_index():
+    index = (np.array([], dtype=np.int32), np.empty((0, 2), dtype=np.float32))
+    coordinates, found = dp.lookup_zips(['75501', '71101'], index)
+    assert not found.any()
+    assert coordinates.shape == (2, 2) and np.isnan(coordinates).all()
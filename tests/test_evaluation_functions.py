@@ -0,0 +1,107 @@
+import pytest
+import numpy as np
+import random
+import copy
+
+import evaluation_functions as ef
+from grouping_functions import select_grouping_function
+
+# Create a dummy distance matrix for one size per remainder case
+sizes = [165, 166, 167, 168, 169]
+
+def make_distances(size):
+    rng = np.random.default_rng(size)
+    locations = rng.random((size, 2)).astype('float32')
+    distances = np.zeros((size, size))
+    for i in range(size):
+        for j in range(i+1, size):
+            distance = np.linalg.norm(locations[j] - locations[i])
+            distances[i][j] = distance
+            distances[j][i] = distance
+    return distances
+
+def area_distance(distances, area):
+    distance = distances[area[-1]][area[0]]
+    for i in range(len(area) - 1):
+        distance += distances[area[i]][area[i + 1]]
+    return distance
+
+# Test 1
+def test_group_sizes_match_grouping_function():
+    for size in sizes:
+        grouping = select_grouping_function(size)
+        expected = [len(area) for area in grouping(list(range(size)))]
+        assert list(ef.group_sizes(grouping, size)) == expected
+
+# Test 2
+def test_group_layout_covers_every_position():
+    for size in sizes:
+        layout = ef.group_layout(select_grouping_function(size), size)
+        positions = np.concatenate([p.ravel() for _, p in layout])
+        assert sorted(positions) == list(range(size))
+
+# Test 3
+def test_batch_matches_sequential_scores_exactly():
+    for size in sizes:
+        distances = make_distances(size)
+        grouping = select_grouping_function(size)
+        layout = ef.group_layout(grouping, size)
+        population = [random.sample(range(size), size) for _ in range(20)]
+        expected = [np.mean([area_distance(distances, area)
+                             for area in grouping(ind)])
+                    for ind in population]
+        scores = ef.batch_average_distance(population, distances, layout)
+        assert list(scores) == expected
+
+# Test 4
+def test_batch_accepts_single_individual():
+    distances = make_distances(sizes[0])
+    layout = ef.group_layout(select_grouping_function(sizes[0]), sizes[0])
+    individual = random.sample(range(sizes[0]), sizes[0])
+    assert ef.batch_average_distance(individual, distances, layout).shape == (1,)
+
+# Test 5
+def test_incremental_matches_full_scores_after_swaps():
+    class Individual(list):
+        pass
+    for size in sizes:
+        distances = make_distances(size)
+        layout = ef.group_layout(select_grouping_function(size), size)
+        starts = ef.group_starts(layout)
+        population = [Individual(random.sample(range(size), size))
+                      for _ in range(10)]
+        ef.incremental_average_distance(population, distances, layout, starts)
+        offspring = [copy.deepcopy(ind) for ind in population]
+        for ind in offspring:
+            i, j = random.sample(range(size), 2)
+            ind[i], ind[j] = ind[j], ind[i]
+        scores = ef.incremental_average_distance(offspring, distances,
+                                                 layout, starts)
+        assert list(scores) == list(ef.batch_average_distance(
+                                        offspring, distances, layout))
+
+# Test 6
+def test_tour_table_lists_distinct_cycles():
+    assert len(ef.tour_table(4)) == 3
+    assert len(ef.tour_table(5)) == 12
+    keys = {tuple(cycle) for cycle in ef.tour_table(5)}
+    assert len(keys) == 12
+
+# Test 7
+def test_tour_objective_ignores_member_order():
+    size = sizes[0]
+    distances = make_distances(size)
+    layout = ef.group_layout(select_grouping_function(size), size)
+    population = np.array([random.sample(range(size), size)
+                           for _ in range(10)])
+    tours = ef.batch_average_distance(population, distances, layout, 'tour')
+    sequences = ef.batch_average_distance(population, distances, layout)
+    assert np.all(tours <= sequences)
+    shuffled = population.copy()
+    for _, positions in layout:
+        for row in positions:
+            shuffled[:, row] = shuffled[:, np.random.permutation(row)]
+    assert np.allclose(ef.batch_average_distance(shuffled, distances,
+                                                 layout, 'tour'), tours)
+    with pytest.raises(ValueError):
+        ef.batch_average_distance(population, distances, layout, 'bogus')
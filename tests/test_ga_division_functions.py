@@ -2,10 +2,10 @@ import pytest
 import numpy as np
 import pandas as pd
 import os.path
-import pickle
 import random
 
 import ga_division_functions as gh
+from distance_functions import cache_key, load_cache
 
 # Create dummy district divisions
 area_indices = list(range(34))
@@ -26,16 +26,15 @@ def test_length_function():
 # Test 3
 def test_locations_created():
     district = gh.AreaAlignment()
-    with open('data/area_locations.pkl', 'rb') as f:  
-        locations = pickle.load(f)
+    key = cache_key('data/area_centroids.pkl', district.metric)
+    locations, _ = load_cache(*gh.CACHE_PATHS, key)
     assert len(locations) == len(district)
 
 # Test 4
 def test_distances_created():
     district = gh.AreaAlignment()
-    with open('data/area_dist.pkl', 'rb') as f:  
-        distances = pickle.load(f)
-    assert len(distances) == len(district)
+    distances = np.load(gh.CACHE_PATHS[1], mmap_mode='r')
+    assert distances.shape == (len(district), len(district))
 
 # Test 5
 def test_get_areas_function_selected():
@@ -0,0 +1,51 @@
+import pytest
+import time
+import numpy as np
+from deap import tools
+
+import ga_loop_functions as gl
+import area_realign
+
+# Test 1
+def test_stall_fires_after_patience():
+    stopping = gl.EarlyStopping(patience=3)
+    reasons = [stopping.update(score) for score in [5, 4, 4, 4, 4]]
+    assert reasons == [None, None, None, None, 'stall']
+
+# Test 2
+def test_min_improvement_over_window():
+    stopping = gl.EarlyStopping(min_improvement=0.1, window=2)
+    reasons = [stopping.update(score) for score in [10, 8, 6, 5.9, 5.8]]
+    assert reasons[:4] == [None, None, None, None]
+    assert reasons[4] == 'min_improvement'
+
+# Test 3
+def test_time_budget():
+    stopping = gl.EarlyStopping(time_budget=0.01)
+    stopping.start()
+    time.sleep(0.02)
+    assert stopping.update(1.0) == 'time_budget'
+
+# Test 4
+def test_disabled_rules_never_fire():
+    stopping = gl.EarlyStopping()
+    assert all(stopping.update(1.0) is None for _ in range(100))
+
+# Test 5
+def test_gen_offset_keeps_local_search_on_global_generations():
+    locations = np.random.default_rng(30).random((30, 2))
+    _, toolbox = area_realign.create_problem('euclidean', locations=locations)
+    searched = []
+    toolbox.register('local_search', lambda ind: searched.append(ind))
+    population = toolbox.population_creator(n=10)
+    hof = tools.HallOfFame(1)
+    # Two blocks of three generations, local search every second one
+    gens = []
+    for done in (0, 3):
+        _, logbook = gl.ea_simple_batched(population, toolbox, 0.9, 0.15, 3,
+                                          halloffame=hof, verbose=False,
+                                          local_search_every=2,
+                                          gen_offset=done)
+        gens += logbook.select('gen')
+    assert gens == [0, 1, 2, 3, 3, 4, 5, 6]
+    assert len(searched) == 3
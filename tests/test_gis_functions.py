@@ -0,0 +1,48 @@
+import pytest
+import json
+import numpy as np
+import pandas as pd
+
+import gis_functions as gf
+
+# Create dummy clubs in two areas of one division
+rng = np.random.RandomState(0)
+clubs = pd.DataFrame({'club_no': np.arange(10),
+                      'lat': rng.uniform(30, 31, 10),
+                      'long': rng.uniform(-95, -94, 10),
+                      'area': [1] * 5 + [2] * 5,
+                      'division': ['A'] * 10})
+
+# Test 1
+def test_buffered_hull_ignores_inside_points():
+    square = np.array([[0, 0], [1, 0], [1, 1], [0, 1]])
+    inside = np.array([[0.5, 0.5], [0.2, 0.7], [0.9, 0.1]])
+    ring = gf.buffered_hull(np.vstack([square, inside]), 0.1)
+    assert np.array_equal(ring, gf.buffered_hull(square, 0.1))
+    assert np.allclose(ring.min(axis=0), -0.1)
+    assert np.allclose(ring.max(axis=0), 1.1)
+
+# Test 2
+def test_buffered_hull_is_closed_and_keeps_its_distance():
+    points = rng.uniform(0, 1, (20, 2))
+    ring = gf.buffered_hull(points, 0.1)
+    assert (ring[0] == ring[-1]).all()
+    # Every ring point is about the buffer away from the nearest club
+    nearest = np.sqrt(((ring[:, None, :] - points[None, :, :]) ** 2)
+                      .sum(axis=2)).min(axis=1)
+    assert np.allclose(nearest, 0.1, atol=0.01)
+
+# Test 3
+def test_geojson_holds_every_layer(tmpdir):
+    path = str(tmpdir.join('district.geojson'))
+    gf.write_layers(path, gf.district_layers(clubs))
+    with open(path) as f:
+        features = json.load(f)['features']
+    layers = [feature['properties']['layer'] for feature in features]
+    assert layers.count('clubs') == 10
+    assert layers.count('areas') == 2
+    assert layers.count('divisions') == 1
+    assert features[0]['geometry']['coordinates'] == [clubs.long[0],
+                                                      clubs.lat[0]]
+    with pytest.raises(ValueError):
+        gf.write_layers(str(tmpdir.join('district.shp')), {})
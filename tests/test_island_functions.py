@@ -0,0 +1,20 @@
+import pytest
+
+import island_functions as isl
+
+# Test 1
+def test_ring_targets_next_island():
+    assert isl.migration_targets(4, 'ring', 0, 1) == [1, 2, 3, 0]
+
+# Test 2
+def test_random_targets_are_a_shared_derangement():
+    for epoch in range(20):
+        targets = isl.migration_targets(5, 'random', epoch, 7)
+        assert sorted(targets) == list(range(5))
+        assert all(target != i for i, target in enumerate(targets))
+        assert targets == isl.migration_targets(5, 'random', epoch, 7)
+
+# Test 3
+def test_unknown_topology_raises():
+    with pytest.raises(ValueError):
+        isl.run_islands(None, (), 2, 10, 10, 0.9, 0.1, 1, topology='star')
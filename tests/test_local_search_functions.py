@@ -0,0 +1,43 @@
+import pytest
+import numpy as np
+import random
+
+import local_search_functions as ls
+import evaluation_functions as ef
+from distance_functions import pairwise_distances, nearest_neighbors
+from grouping_functions import select_grouping_function
+
+# Create a dummy district
+size = 83
+rng = np.random.default_rng(83)
+distances = pairwise_distances(rng.random((size, 2)))
+layout = ef.group_layout(select_grouping_function(size), size)
+
+# Test 1
+def test_nearest_neighbors_exclude_self_and_are_sorted():
+    neighbors = nearest_neighbors(distances, 5, block_size=10)
+    assert neighbors.shape == (size, 5)
+    assert not (neighbors == np.arange(size)[:, None]).any()
+    rows = distances[np.arange(size)[:, None], neighbors]
+    assert (np.diff(rows, axis=1) >= 0).all()
+    assert (rows[:, -1] <= np.sort(distances, axis=1)[:, 5]).all()
+
+# Test 2
+def test_swap_delta_matches_rescoring():
+    ordering = np.array(random.sample(range(size), size))
+    cycle = ls.cycle_neighbors(layout, size)
+    i, j, delta = ls.best_group_swap(ordering, distances, cycle)
+    before = ef.batch_group_distances(ordering, distances, layout).sum()
+    ordering[[i, j]] = ordering[[j, i]]
+    after = ef.batch_group_distances(ordering, distances, layout).sum()
+    assert np.isclose(after - before, delta)
+
+# Test 3
+def test_improve_ordering_keeps_permutation_and_improves():
+    individual = random.sample(range(size), size)
+    before = ef.batch_average_distance(individual, distances, layout)[0]
+    moves = ls.improve_ordering(individual, distances, layout,
+                                nearest_neighbors(distances, 10))
+    assert moves > 0
+    assert sorted(individual) == list(range(size))
+    assert ef.batch_average_distance(individual, distances, layout)[0] < before
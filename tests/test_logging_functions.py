@@ -0,0 +1,53 @@
+import pytest
+import numpy as np
+from deap import base, creator, tools
+
+import logging_functions as lf
+
+if not hasattr(creator, 'MinFit'):
+    creator.create('MinFit', base.Fitness, weights=(-1.0,))
+if not hasattr(creator, 'Individual'):
+    creator.create('Individual', list, fitness=creator.MinFit)
+
+# Create a dummy population
+population = []
+for score in [3.0, 1.0, 2.0]:
+    individual = creator.Individual([0])
+    individual.fitness.values = (score,)
+    population.append(individual)
+
+# Test 1
+def test_fitness_statistics_match_numpy():
+    record = lf.FitnessStatistics().compile(population)
+    assert record == {'min': 1.0, 'avg': 2.0,
+                      'std': pytest.approx(np.std([3.0, 1.0, 2.0]))}
+
+# Test 2
+def test_logger_samples_and_tracks_best(tmp_path, capsys):
+    path = str(tmp_path / 'log.jsonl')
+    logger = lf.GenerationLogger(path, every=5, progress_every=0,
+                                 buffer_size=2)
+    for gen in range(12):
+        logger.record(gen, 10, {'min': 10.0 - gen if gen < 6 else 5.0,
+                                'avg': 11.0, 'std': 0.5},
+                      last=gen == 11)
+    logger.close()
+    log = lf.load_generation_log(path)
+    assert list(log.gen) == [0, 5, 10, 11]
+    assert list(log.evaluations) == [10, 60, 110, 120]
+    assert log.best.iloc[-1] == 5.0
+    assert capsys.readouterr().out == ''
+
+# Test 3
+def test_logger_resumes_from_logbook(tmp_path):
+    path = str(tmp_path / 'log.jsonl')
+    logbook = tools.Logbook()
+    logbook.record(gen=0, nevals=100, min=2.0, avg=3.0)
+    logbook.record(gen=1, nevals=50, min=1.5, avg=2.0)
+    logger = lf.GenerationLogger(path, progress_every=0)
+    logger.resume_from(logbook)
+    logger.record(2, 40, {'min': 1.8, 'avg': 2.0})
+    logger.close()
+    log = lf.load_generation_log(path)
+    assert log.evaluations.iloc[0] == 190
+    assert log.best.iloc[0] == 1.5
@@ -0,0 +1,51 @@
+import pytest
+import numpy as np
+
+import multilevel_functions as ml
+import evaluation_functions as ef
+from distance_functions import pairwise_distances
+from grouping_functions import select_grouping_function
+from ga_area_functions import DistrictRealignment
+
+# Create a dummy district
+size = 163
+rng = np.random.default_rng(163)
+locations = rng.random((size, 2))
+distances = pairwise_distances(locations)
+grouping = select_grouping_function(size)
+layout = ef.group_layout(grouping, size)
+sizes = ef.group_sizes(grouping, size)
+region_groups = ef.group_sizes(select_grouping_function(len(sizes)),
+                               len(sizes))
+
+def setup(locations):
+    return DistrictRealignment(locations=locations), None
+
+options = {'engine': 'kmeans', 'restarts': 2, 'neighbors': 5}
+
+# Test 1
+def test_regions_fill_their_slots_exactly():
+    labels, slots = ml.partition_regions(locations, sizes, region_groups,
+                                         np.random.RandomState(0))
+    assert np.concatenate(slots).tolist() == list(range(len(sizes)))
+    for region, region_slots in enumerate(slots):
+        assert np.sum(labels == region) == sizes[region_slots].sum()
+
+# Test 2
+def test_boundary_neighbors_only_cross_regions():
+    neighbors = np.array([[1, 2], [0, 2], [0, 1]])
+    labels = np.array([0, 0, 1])
+    assert ml.boundary_neighbors(neighbors, labels).tolist() == \
+           [[0, 2], [1, 2], [0, 1]]
+
+# Test 3
+def test_multilevel_ordering_is_a_refined_permutation():
+    ordering, scores = ml.multilevel_ordering(setup, (), locations,
+                                              distances, sizes, layout,
+                                              region_groups, options, seed=1,
+                                              rng=np.random.RandomState(1))
+    assert sorted(ordering) == list(range(size))
+    assert len(scores['region_scores']) == len(region_groups)
+    assert scores['refined'] <= scores['assembled']
+    assert scores['refined'] == pytest.approx(
+                ef.batch_average_distance(ordering, distances, layout)[0])
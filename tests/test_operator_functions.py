@@ -0,0 +1,64 @@
+import pytest
+import numpy as np
+import random
+import array
+
+import operator_functions as of
+import evaluation_functions as ef
+from distance_functions import pairwise_distances, nearest_neighbors
+from grouping_functions import select_grouping_function
+
+# Create a dummy district
+size = 83
+rng = np.random.default_rng(83)
+distances = pairwise_distances(rng.random((size, 2)))
+layout = ef.group_layout(select_grouping_function(size), size)
+groups = of.position_groups(layout, size)
+neighbors = nearest_neighbors(distances, 5)
+
+# Test 1
+def test_position_groups_match_grouping_function():
+    grouping = select_grouping_function(size)
+    areas = list(grouping(list(range(size))))
+    for number, area in enumerate(areas):
+        assert len(set(groups[area])) == 1
+    assert len(set(groups)) == len(areas)
+
+# Test 2
+def test_neighbor_swap_keeps_permutation():
+    for _ in range(20):
+        individual = array.array('i', random.sample(range(size), size))
+        of.mut_neighbor_swap(individual, neighbors, groups, indpb=0.2)
+        assert sorted(individual) == list(range(size))
+
+# Test 3
+def test_single_neighbor_swap_joins_a_neighbor_group():
+    random.seed(3)
+    checked = 0
+    while checked < 20:
+        individual = list(random.sample(range(size), size))
+        before = list(individual)
+        of.mut_neighbor_swap(individual, neighbors, groups, indpb=1.0/size)
+        moved = [i for i in range(size) if individual[i] != before[i]]
+        if len(moved) == 2:
+            assert groups[moved[0]] != groups[moved[1]]
+            # One of the two clubs now shares a group with a neighbor
+            location = of.locate(individual)
+            assert any(groups[location[n]] == groups[i]
+                       for i in moved for n in neighbors[individual[i]])
+            checked += 1
+
+# Test 4
+def test_region_crossover_copies_region_placement():
+    random.seed(4)
+    ind1 = array.array('i', random.sample(range(size), size))
+    ind2 = array.array('i', random.sample(range(size), size))
+    parent1, parent2 = ind1[:], ind2[:]
+    random.seed(5)
+    center = random.randrange(size)
+    random.seed(5)
+    of.cx_neighbor_region(ind1, ind2, neighbors)
+    assert sorted(ind1) == sorted(ind2) == list(range(size))
+    for club in [center] + list(neighbors[center]):
+        assert ind1.index(club) == parent2.index(club)
+        assert ind2.index(club) == parent1.index(club)
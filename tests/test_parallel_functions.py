@@ -0,0 +1,56 @@
+import pytest
+import os
+import numpy as np
+
+import parallel_functions as pf
+import evaluation_functions as ef
+from distance_functions import pairwise_distances
+from grouping_functions import select_grouping_function
+
+# Create a dummy district and population
+size = 23
+rng = np.random.default_rng(23)
+distances = pairwise_distances(rng.random((size, 2)))
+layout = ef.group_layout(select_grouping_function(size), size)
+population = [rng.permutation(size).tolist() for _ in range(7)]
+
+# Test 1
+def test_pool_scores_match_serial_scores():
+    with pf.ParallelEvaluator(distances, layout, 2, seed=1) as evaluator:
+        scores = evaluator.evaluate_population(population)
+    expected = ef.batch_average_distance(np.array(population), distances,
+                                         layout)
+    assert [score for score, in scores] == pytest.approx(expected.tolist())
+
+# Test 2
+def test_close_only_removes_temporary_file(tmpdir):
+    evaluator = pf.ParallelEvaluator(distances, layout, 1)
+    temporary = evaluator.distances_path
+    assert os.path.exists(temporary)
+    evaluator.close()
+    assert not os.path.exists(temporary)
+
+    path = str(tmpdir.join('distances.npy'))
+    np.save(path, distances)
+    evaluator = pf.ParallelEvaluator(np.load(path, mmap_mode='r'), layout, 1)
+    assert evaluator.distances_path == path
+    evaluator.close()
+    assert os.path.exists(path)
+
+# Test 3
+def test_sliced_memmap_is_copied(tmpdir):
+    path = str(tmpdir.join('distances.npy'))
+    padded = pairwise_distances(np.random.default_rng(5).random((size + 10, 2)))
+    padded[5:5 + size, 5:5 + size] = distances
+    np.save(path, padded)
+    whole = np.load(path, mmap_mode='r')
+    assert pf.whole_file(whole) == path
+    assert pf.whole_file(whole.T) is None
+    with pf.ParallelEvaluator(whole[5:5 + size, 5:5 + size], layout,
+                              2) as evaluator:
+        assert evaluator.temporary
+        scores = evaluator.evaluate_population(population)
+    expected = ef.batch_average_distance(np.array(population), distances,
+                                         layout)
+    assert [score for score, in scores] == pytest.approx(expected.tolist())
+    assert os.path.exists(path)
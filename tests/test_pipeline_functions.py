@@ -0,0 +1,58 @@
+import pytest
+import os
+
+from pipeline_functions import Pipeline
+
+def make_pipeline(directory, calls, offset=1, source=None):
+    def first():
+        calls.append('first')
+        return 10
+    def second(value):
+        calls.append('second')
+        return value + offset
+    pipeline = Pipeline(str(directory))
+    pipeline.add('first', first, sources=[source] if source else [])
+    pipeline.add('second', second, inputs=['first'], params={'offset': offset})
+    return pipeline
+
+# Test 1
+def test_stages_run_once_then_skip(tmp_path):
+    calls = []
+    status = make_pipeline(tmp_path, calls).run()
+    assert status == {'first': 'ran', 'second': 'ran'}
+    calls.clear()
+    pipeline = make_pipeline(tmp_path, calls)
+    assert pipeline.run() == {'first': 'skipped', 'second': 'skipped'}
+    assert calls == []
+    assert pipeline.result('second') == 11
+
+# Test 2
+def test_changed_params_rerun_only_that_stage(tmp_path):
+    calls = []
+    make_pipeline(tmp_path, calls).run()
+    calls.clear()
+    pipeline = make_pipeline(tmp_path, calls, offset=2)
+    assert pipeline.run() == {'first': 'skipped', 'second': 'ran'}
+    assert calls == ['second']
+    assert pipeline.result('second') == 12
+
+# Test 3
+def test_changed_source_reruns_downstream(tmp_path):
+    source = tmp_path / 'clubs.csv'
+    source.write_text('a')
+    calls = []
+    make_pipeline(tmp_path, calls, source=str(source)).run()
+    source.write_text('b')
+    calls.clear()
+    make_pipeline(tmp_path, calls, source=str(source)).run()
+    assert calls == ['first', 'second']
+
+# Test 4
+def test_targets_and_force(tmp_path):
+    calls = []
+    assert make_pipeline(tmp_path, calls).run(['first']) == {'first': 'ran'}
+    calls.clear()
+    make_pipeline(tmp_path, calls).run(force=['first'])
+    assert calls == ['first', 'second']
+    with pytest.raises(ValueError):
+        make_pipeline(tmp_path, calls).run(['missing'])
@@ -0,0 +1,30 @@
+import pytest
+import subprocess
+import sys
+import os.path
+from deap import tools
+
+import plot_functions as pf
+
+# Create a dummy logbook
+logbook = tools.Logbook()
+for gen in range(5):
+    logbook.record(gen=gen, min=1.0 / (gen + 1), avg=2.0 / (gen + 1))
+
+# Test 1
+def test_runners_import_without_plotting_libraries():
+    code = ('import sys, area_realign, division_realign; '
+            'print("matplotlib" in sys.modules or "seaborn" in sys.modules)')
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                            text=True, check=True)
+    assert result.stdout.strip() == 'False'
+
+# Test 2
+def test_plot_convergence_none_skips():
+    assert pf.plot_convergence(logbook, 'none') is None
+
+# Test 3
+def test_plot_convergence_writes_file(tmp_path):
+    path = str(tmp_path / 'convergence.png')
+    assert pf.plot_convergence(logbook, path) == path
+    assert os.path.getsize(path) > 0
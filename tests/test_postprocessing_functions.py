@@ -0,0 +1,45 @@
+import pytest
+import numpy as np
+import pandas as pd
+import random
+
+import postprocessing_functions as pf
+from assignment_functions import select_assignment_function
+
+# Create a dummy district
+size = 83
+rng = np.random.default_rng(83)
+clubs = pd.DataFrame({'club_no': np.arange(1000, 1000 + size),
+                      'lat': rng.random(size),
+                      'long': rng.random(size)})
+
+# Test 1
+def test_group_labels_follow_assignment_function():
+    ordering = random.sample(range(size), size)
+    labels = pf.group_labels(ordering)
+    expected = select_assignment_function(size)(ordering)
+    assert [labels[i] for i in ordering] == list(expected)
+
+# Test 2
+def test_district_alignment_sizes():
+    area_clubs = pf.clubs_with_areas(clubs, random.sample(range(size), size))
+    centroids = pf.area_centroids(area_clubs)
+    assert len(centroids) == 17
+    district = pf.district_alignment(area_clubs, centroids,
+                                     random.sample(range(17), 17))
+    assert sorted(district.club_no) == list(clubs.club_no)
+    assert sorted(district.groupby('area').size().unique()) == [4, 5]
+    assert district.division.nunique() == 4
+    # Area numbers are the division number times ten plus a position
+    assert (district.area // 10 == district.division).all()
+
+# Test 3
+def test_remap_areas_numbers_areas_within_divisions():
+    df = pd.DataFrame({'club_no': [1, 2, 3, 4, 5, 6],
+                       'area': [3, 3, 7, 2, 9, 9],
+                       'division': [1, 1, 1, 2, 2, 2],
+                       'lat': 0.0, 'long': 0.0})
+    remapped = pf.remap_areas(df)
+    assert list(remapped.area) == [10, 10, 11, 20, 21, 21]
+    assert list(remapped.columns) == ['club_no', 'area', 'division',
+                                      'lat', 'long']
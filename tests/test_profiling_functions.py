@@ -0,0 +1,82 @@
+import pytest
+import random
+from deap import base, creator, tools
+
+import profiling_functions as pf
+from ga_loop_functions import ea_simple_batched
+from logging_functions import FitnessStatistics
+from cache_functions import FitnessCache, cached_evaluation
+
+if not hasattr(creator, 'MinFit'):
+    creator.create('MinFit', base.Fitness, weights=(-1.0,))
+if not hasattr(creator, 'Individual'):
+    creator.create('Individual', list, fitness=creator.MinFit)
+
+# Create a dummy toolbox that sorts a permutation
+def create_toolbox():
+    toolbox = base.Toolbox()
+    toolbox.register('individual', lambda: creator.Individual(
+                                                random.sample(range(8), 8)))
+    toolbox.register('evaluate_population', lambda population: [
+                        (sum(abs(a - i) for i, a in enumerate(ind)),)
+                        for ind in population])
+    toolbox.register('select', tools.selTournament, tournsize=2)
+    toolbox.register('mate', tools.cxOrdered)
+    toolbox.register('mutate', tools.mutShuffleIndexes, indpb=0.1)
+    return toolbox
+
+# Test 1
+def test_timed_counts_calls_and_evaluations():
+    profiler = pf.PhaseProfiler()
+    evaluate = profiler.timed('evaluate_population', lambda p: [1] * len(p))
+    evaluate([1, 2, 3])
+    evaluate([4])
+    assert profiler.calls['evaluate_population'] == 2
+    assert profiler.evaluations == 4
+    assert profiler.lap()['t_evaluate_population'] >= 0
+    assert profiler.lap()['t_evaluate_population'] == 0
+
+# Test 2
+def test_profiled_loop_matches_and_logs_phases():
+    random.seed(8)
+    toolbox = create_toolbox()
+    population = [toolbox.individual() for _ in range(20)]
+    plain = [creator.Individual(ind) for ind in population]
+    profiler = pf.PhaseProfiler()
+    profiler.instrument(toolbox)
+
+    random.seed(9)
+    _, logbook = ea_simple_batched(population, toolbox, 0.9, 0.2, 10,
+                                   stats=FitnessStatistics(),
+                                   halloffame=tools.HallOfFame(1),
+                                   verbose=False, profiler=profiler)
+    random.seed(9)
+    _, plain_logbook = ea_simple_batched(plain, create_toolbox(), 0.9, 0.2,
+                                         10, stats=FitnessStatistics(),
+                                         halloffame=tools.HallOfFame(1),
+                                         verbose=False)
+    assert logbook.select('min') == plain_logbook.select('min')
+    assert profiler.calls['select'] == 10
+    assert profiler.calls['halloffame'] == 11
+    assert profiler.evaluations == sum(logbook.select('nevals'))
+    assert 't_mate' in logbook[-1]
+
+# Test 3
+def test_summary_lists_every_phase():
+    profiler = pf.PhaseProfiler()
+    with profiler.phase('halloffame'):
+        pass
+    text = profiler.format_summary()
+    assert 'halloffame' in text and 'other' in text
+
+# Test 4
+def test_cached_evaluation_counts_only_misses():
+    cache = FitnessCache()
+    cached = cached_evaluation(lambda p: [(float(ind),) for ind in p],
+                               lambda p: list(p), cache)
+    profiler = pf.PhaseProfiler()
+    evaluate = profiler.timed('evaluate_population', cached, cache)
+    evaluate([1, 2, 2, 3])
+    evaluate([1, 2, 4])
+    assert profiler.evaluations == 4
+    assert cache.stats()['evaluated'] == 4
@@ -0,0 +1,58 @@
+import pytest
+import numpy as np
+import random
+
+import seeding_functions as sf
+import evaluation_functions as ef
+from distance_functions import pairwise_distances
+from grouping_functions import select_grouping_function
+
+# Create a dummy district
+size = 83
+rng = np.random.default_rng(83)
+locations = rng.random((size, 2))
+distances = pairwise_distances(locations)
+grouping = select_grouping_function(size)
+layout = ef.group_layout(grouping, size)
+sizes = ef.group_sizes(grouping, size)
+
+# Test 1
+def test_hilbert_curve_visits_grid_cells_in_adjacent_steps():
+    grid = np.array([(x, y) for x in range(8) for y in range(8)])
+    index = sf.hilbert_index(grid[:, 0], grid[:, 1], order=3)
+    assert sorted(index) == list(range(64))
+    path = grid[np.argsort(index)]
+    assert (np.abs(np.diff(path, axis=0)).sum(axis=1) == 1).all()
+
+# Test 2
+def test_morton_index_interleaves_bits():
+    assert list(sf.morton_index([0, 1, 0, 1, 2], [0, 0, 1, 1, 0],
+                                order=2)) == [0, 1, 2, 3, 4]
+
+# Test 3
+def test_capacitated_kmeans_matches_group_sizes():
+    np.random.seed(3)
+    labels = sf.capacitated_kmeans(locations, sizes)
+    assert list(np.bincount(labels, minlength=len(sizes))) == list(sizes)
+
+# Test 4
+def test_seed_orderings_are_compact_permutations():
+    np.random.seed(4)
+    orderings = sf.seed_orderings(locations, sizes, len(sf.HEURISTICS))
+    random_orderings = [np.random.permutation(size) for _ in range(20)]
+    worst_seed = ef.batch_average_distance(orderings, distances, layout).max()
+    best_random = ef.batch_average_distance(random_orderings, distances,
+                                            layout).min()
+    for ordering in orderings:
+        assert sorted(ordering) == list(range(size))
+    assert worst_seed < best_random
+
+# Test 5
+def test_seeded_population_mixes_seeds_and_random():
+    np.random.seed(5)
+    population = sf.init_seeded_population(
+                    list, lambda: random.sample(range(size), size),
+                    lambda count: sf.seed_orderings(locations, sizes, count),
+                    n=10, fraction=0.3)
+    assert len(population) == 10
+    assert all(sorted(ind) == list(range(size)) for ind in population)